@@ -7,9 +7,6 @@ import os
 import logging
 from database import ClassifierDB
 import config
-from werkzeug.utils import safe_join
-import re
-from datetime import datetime
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -21,18 +18,15 @@ app.config['SECRET_KEY'] = 'your-secret-key-here'
 # Initialize database
 db = ClassifierDB()
 
+# Resolve the video directory once instead of on every request
+VIDEO_DIR_ABS = os.path.abspath(config.VIDEO_DIR)
 
-def extract_datetime_from_filename(filename):
-    """Extract datetime from filename like motion_20250626_124450_6s.mp4 -> 2025-06-26 12:44:50"""
-    match = re.search(r'(\d{8})_(\d{6})', filename)
-    if match:
-        date_str, time_str = match.groups()
-        try:
-            dt = datetime.strptime(date_str + time_str, '%Y%m%d%H%M%S')
-            return dt
-        except Exception:
-            return None
-    return None
+
+def add_recorded_date(clips):
+    """Add recorded_date (YYYY-MM-DD) from the recorded_at column stored by the inspector"""
+    for clip in clips:
+        recorded_at = clip.get('recorded_at')
+        clip['recorded_date'] = recorded_at[:10] if recorded_at else None
 
 
 @app.route('/')
@@ -64,18 +58,8 @@ def index():
         # Debug print for processed_at
         print("DEBUG CLIPS:", [{k: v for k, v in clip.items() if k in ('filename', 'processed_at')} for clip in clips[:3]])
 
-        # Add recorded_at and recorded_date from filename
-        for clip in clips:
-            dt = extract_datetime_from_filename(clip.get('filename', ''))
-            if dt:
-                clip['recorded_at'] = dt.strftime('%Y-%m-%d %H:%M:%S')
-                clip['recorded_date'] = dt.strftime('%Y-%m-%d')
-            else:
-                clip['recorded_at'] = None
-                clip['recorded_date'] = None
-
-        # Sort by recorded_at descending (newest first)
-        clips.sort(key=lambda c: c.get('recorded_at', ''), reverse=True)
+        # Clips are already sorted by recorded_at (newest first) in SQL
+        add_recorded_date(clips)
 
         return render_template('index.html',
                              clips=clips,
@@ -94,18 +78,8 @@ def history():
         # Get classified clips
         classified = db.get_classified_clips(config.MAX_VIDEOS_PER_PAGE)
 
-        # Add recorded_at and recorded_date from filename
-        for clip in classified:
-            dt = extract_datetime_from_filename(clip.get('filename', ''))
-            if dt:
-                clip['recorded_at'] = dt.strftime('%Y-%m-%d %H:%M:%S')
-                clip['recorded_date'] = dt.strftime('%Y-%m-%d')
-            else:
-                clip['recorded_at'] = None
-                clip['recorded_date'] = None
-
-        # Sort by recorded_at descending (newest first)
-        classified.sort(key=lambda c: c.get('recorded_at', ''), reverse=True)
+        # Clips are already sorted by recorded_at (newest first)
+        add_recorded_date(classified)
 
         return render_template('history.html',
                              clips=classified,
@@ -146,12 +120,12 @@ def classify_clip():
 def serve_video(filename):
     """Serve video files from VIDEO_DIR, including subfolders, safely"""
     try:
-        video_dir = os.path.abspath(config.VIDEO_DIR)
-        # Prevent directory traversal
-        safe_path = safe_join(video_dir, filename)
-        if not safe_path or not os.path.isfile(safe_path) or not safe_path.startswith(video_dir):
-            abort(404)
-        return send_from_directory(video_dir, filename)
+        # send_from_directory rejects directory traversal and missing files, and
+        # answers conditional/range requests (ETag, If-None-Match, Range) itself
+        response = send_from_directory(VIDEO_DIR_ABS, filename, max_age=config.VIDEO_CACHE_MAX_AGE)
+        # Clips never change once the watcher has written them
+        response.cache_control.immutable = True
+        return response
     except Exception as e:
         logger.error(f"Error serving video {filename}: {e}")
         return jsonify({'error': 'Video not found'}), 404
@@ -174,18 +148,8 @@ def get_unclassified():
     try:
         clips = db.get_unclassified_clips(config.MAX_VIDEOS_PER_PAGE)
 
-        # Add recorded_at and recorded_date from filename
-        for clip in clips:
-            dt = extract_datetime_from_filename(clip.get('filename', ''))
-            if dt:
-                clip['recorded_at'] = dt.strftime('%Y-%m-%d %H:%M:%S')
-                clip['recorded_date'] = dt.strftime('%Y-%m-%d')
-            else:
-                clip['recorded_at'] = None
-                clip['recorded_date'] = None
-
-        # Sort by recorded_at descending (newest first)
-        clips.sort(key=lambda c: c.get('recorded_at', ''), reverse=True)
+        # Clips are already sorted by recorded_at (newest first) in SQL
+        add_recorded_date(clips)
 
         return jsonify(clips)
     except Exception as e:
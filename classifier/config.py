@@ -9,10 +9,17 @@ FLASK_DEBUG = True
 
 # Database settings
 DATABASE_PATH = "../inspector/car_detection.db"  # Path to the inspector's database
+CLIP_CACHE_TTL = 2.0  # Seconds clip lists are cached per process (cleared on classification)
+STATS_CACHE_TTL = 5.0  # Seconds statistics are cached per process (cleared on classification)
+CLIP_LIST_COLUMNS = (  # Columns loaded for clip lists (the pages never show the rest)
+    'id', 'filename', 'file_path', 'is_car', 'is_distracted', 'car_ratio', 'duration',
+    'frames_analyzed', 'processed_at', 'recorded_at',
+)
 
 # Video settings
 VIDEO_DIR = "../inspector/downloaded_clips"  # Directory containing video clips
 MAX_VIDEOS_PER_PAGE = 20
+VIDEO_CACHE_MAX_AGE = 3600  # Seconds browsers may cache a clip before revalidating
 
 # Classification options
 CLASSIFICATION_OPTIONS = {
@@ -9,14 +9,20 @@ import importlib.util
 # Get the path to the inspector's database module
 inspector_db_path = os.path.join(os.path.dirname(__file__), '..', 'inspector', 'database.py')
 
-# Load the inspector's database module
-spec = importlib.util.spec_from_file_location("inspector_database", inspector_db_path)
-inspector_database = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(inspector_database)
+# Load the inspector's database module once per process. It is loaded by path because
+# both components have a database.py; the file loader still uses the inspector's __pycache__.
+inspector_database = sys.modules.get("inspector_database")
+if inspector_database is None:
+    spec = importlib.util.spec_from_file_location("inspector_database", inspector_db_path)
+    inspector_database = importlib.util.module_from_spec(spec)
+    sys.modules["inspector_database"] = inspector_database
+    spec.loader.exec_module(inspector_database)
 
 import config
 import logging
-from typing import List, Dict, Optional
+import threading
+import time
+from typing import Iterable, List, Dict, Optional, Tuple
 
 
 class ClassifierDB:
@@ -29,6 +35,10 @@ class ClassifierDB:
         self.db = inspector_database.CarDetectionDB(config.DATABASE_PATH)
         self.logger = logging.getLogger(__name__)
 
+        # Short-lived cache of clip lists and statistics: key -> (loaded_at, value)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
     def get_unclassified_clips(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Get clips that haven't been classified for distraction yet
@@ -37,9 +47,11 @@ class ClassifierDB:
             limit: Maximum number of clips to return
 
         Returns:
-            List of clip dictionaries
+            List of clip dictionaries sorted by recorded_at DESC
         """
-        return self.db.get_unanalyzed_distraction_clips(limit)
+        return self._cached_clips(('unclassified', limit),
+                                  lambda: self.db.get_unanalyzed_distraction_clips(limit, order_by='recorded_at',
+                                                                                   columns=config.CLIP_LIST_COLUMNS))
 
     def get_classified_clips(self, limit: Optional[int] = None) -> List[Dict]:
         """
@@ -49,20 +61,11 @@ class ClassifierDB:
             limit: Maximum number of clips to return
 
         Returns:
-            List of clip dictionaries sorted by processed_at DESC
+            List of clip dictionaries sorted by recorded_at DESC
         """
-        # Get both distracted and not distracted clips without limit first
-        distracted = self.db.get_distracted_clips(None)  # Get all
-        not_distracted = self.db.get_not_distracted_clips(None)  # Get all
-
-        # Combine and sort by processed_at
-        all_clips = distracted + not_distracted
-        all_clips.sort(key=lambda x: x.get('processed_at', ''), reverse=True)
-
-        # Apply limit after sorting
-        if limit:
-            return all_clips[:limit]
-        return all_clips
+        return self._cached_clips(('classified', limit),
+                                  lambda: self.db.get_classified_clips(limit, order_by='recorded_at',
+                                                                       columns=config.CLIP_LIST_COLUMNS))
 
     def classify_clip(self, file_path: str, is_distracted: Optional[bool]) -> bool:
         """
@@ -75,7 +78,23 @@ class ClassifierDB:
         Returns:
             True if classification was successful
         """
-        return self.db.update_distraction_analysis(file_path, is_distracted)
+        success = self.db.update_distraction_analysis(file_path, is_distracted)
+        self._invalidate_cache()
+        return success
+
+    def classify_clips(self, classifications: Iterable[Tuple[str, Optional[bool]]]) -> int:
+        """
+        Classify several clips in one transaction
+
+        Args:
+            classifications: (file_path, is_distracted) pairs
+
+        Returns:
+            Number of clips updated
+        """
+        updated = self.db.update_distraction_analyses(classifications)
+        self._invalidate_cache()
+        return updated
 
     def get_clip_by_path(self, file_path: str) -> Optional[Dict]:
         """
@@ -89,6 +108,18 @@ class ClassifierDB:
         """
         return self.db.get_analysis_by_path(file_path)
 
+    def get_clips_by_paths(self, file_paths: List[str]) -> Dict[str, Dict]:
+        """
+        Get several clips by file path in batched queries
+
+        Args:
+            file_paths: Paths to the video files
+
+        Returns:
+            Dictionary mapping file path to clip dictionary (missing paths are left out)
+        """
+        return self.db.get_analyses_by_paths(file_paths)
+
     def get_statistics(self) -> Dict:
         """
         Get classification statistics
@@ -96,20 +127,62 @@ class ClassifierDB:
         Returns:
             Dictionary with statistics
         """
-        return self.db.get_statistics()
+        return dict(self._cached('statistics', config.STATS_CACHE_TTL, self.db.get_statistics))
 
     def get_car_clips(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Get all clips that contain cars
         """
-        return self.db.get_car_clips(limit)
+        return self._cached_clips(('cars', limit),
+                                  lambda: self.db.get_car_clips(limit, order_by='recorded_at',
+                                                                columns=config.CLIP_LIST_COLUMNS))
 
     def get_all_clips(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Get all clips in the database (regardless of car presence or classification)
         """
-        return self.db.get_all_analyses(limit)
+        return self._cached_clips(('all', limit),
+                                  lambda: self.db.get_all_analyses(limit, order_by='recorded_at',
+                                                                   columns=config.CLIP_LIST_COLUMNS))
+
+    def _cached(self, key, ttl: float, load):
+        """
+        Return a cached value, reloading it once it is older than ttl seconds
+
+        Args:
+            key: Cache key
+            ttl: Maximum age in seconds
+            load: Function that loads the value from the database
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                return entry[1]
+
+        value = load()
+        with self._cache_lock:
+            self._cache[key] = (now, value)
+        return value
+
+    def _cached_clips(self, key, load) -> List[Dict]:
+        """Return copies of a cached clip list so callers can annotate them freely"""
+        return [dict(clip) for clip in self._cached(key, config.CLIP_CACHE_TTL, load)]
+
+    def _invalidate_cache(self):
+        """Drop all cached lists and statistics after a classification"""
+        with self._cache_lock:
+            self._cache.clear()
 
     def close(self):
         """Close the database connection"""
-        self.db.close()
\ No newline at end of file
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
\ No newline at end of file
@@ -17,7 +17,13 @@ def main():
 
     input_dir = config.STORAGE_DIR
     video_extensions = ('.mp4', '.avi', '.mov', '.mkv')
-    video_files = [f for f in os.listdir(input_dir) if f.lower().endswith(video_extensions)]
+    # scandir gives names, paths and file types from the directory read itself;
+    # empty files (e.g. interrupted transfers) are skipped up front
+    with os.scandir(input_dir) as it:
+        video_files = sorted((entry for entry in it
+                              if entry.is_file() and entry.name.lower().endswith(video_extensions)
+                              and entry.stat().st_size > 0),
+                             key=lambda entry: entry.name)
 
     if not video_files:
         print(f"No video files found in {input_dir}")
@@ -30,9 +36,10 @@ def main():
     print(f"{'Clip Name':40} | {'Has Car':7} | {'Car Ratio':8} | {'Frames':6} | {'Method':12}")
     print("-" * 85)
 
-    for filename in sorted(video_files):
-        path = os.path.join(input_dir, filename)
-        analysis = detector.analyze_video_clip(path, sample_frames=config.SAMPLE_FRAMES)
+    for entry in video_files:
+        filename = entry.name
+        analysis = detector.analyze_video_clip(entry.path, sample_frames=config.SAMPLE_FRAMES,
+                                               early_exit=False)
         has_car = analysis.get('has_cars', False)
         car_ratio = analysis.get('car_ratio', 0)
         frames = analysis.get('frames_analyzed', 0)
@@ -4,7 +4,10 @@ Script to display car detection results from database in a table format
 """
 
 import os
+import sys
 import argparse
+import itertools
+import operator
 from database import CarDetectionDB
 import config
 
@@ -28,27 +31,23 @@ def main():
         print("Please run car detection first using: pipenv run python run_car_detection.py")
         return
 
-    # Get clips based on filter
-    if args.filter == 'cars':
-        clips = db.get_car_clips(limit=args.limit)
-        title = "Clips WITH Cars"
-    elif args.filter == 'no_cars':
-        clips = db.get_no_car_clips(limit=args.limit)
-        title = "Clips WITHOUT Cars"
-    elif args.filter == 'distracted':
-        clips = db.get_distracted_clips(limit=args.limit)
-        title = "Clips with DISTRACTED Drivers"
-    elif args.filter == 'not_distracted':
-        clips = db.get_not_distracted_clips(limit=args.limit)
-        title = "Clips with NOT DISTRACTED Drivers"
-    elif args.filter == 'unanalyzed_distraction':
-        clips = db.get_unanalyzed_distraction_clips(limit=args.limit)
-        title = "Clips Needing Distraction Analysis"
-    else:
-        clips = db.get_all_analyses(limit=args.limit)
-        title = "All Clips"
-
-    if not clips:
+    # Stream clips based on filter
+    titles = {
+        'all': "All Clips",
+        'cars': "Clips WITH Cars",
+        'no_cars': "Clips WITHOUT Cars",
+        'distracted': "Clips with DISTRACTED Drivers",
+        'not_distracted': "Clips with NOT DISTRACTED Drivers",
+        'unanalyzed_distraction': "Clips Needing Distraction Analysis",
+    }
+    title = titles[args.filter]
+    # Only the columns shown in the table are read from the database
+    columns = ('filename', 'is_car', 'is_distracted', 'car_ratio',
+               'frames_analyzed', 'detection_method', 'processed_at')
+    clips = db.iter_clips(args.filter, limit=args.limit, columns=columns)
+
+    first_clip = next(clips, None)
+    if first_clip is None:
         print(f"No clips found for filter: {args.filter}")
         return
 
@@ -62,26 +61,33 @@ def main():
     print(f"{'Filename':<35} | {'Has Car':<7} | {'Distracted':<10} | {'Car Ratio':<8} | {'Frames':<6} | {'Method':<10} | {'Processed':<20}")
     print("-" * 120)
 
-    for clip in clips:
-        filename = clip['filename'][:34] if clip['filename'] else 'Unknown'  # Truncate if too long
-        is_car = "Yes" if clip['is_car'] else "No"
-        is_distracted = clip.get('is_distracted')
-        distraction_status = "Unknown"
-        if is_distracted is True:
-            distraction_status = "Yes"
-        elif is_distracted is False:
-            distraction_status = "No"
-        car_ratio = clip.get('car_ratio', 0) or 0  # Handle None
-        frames_analyzed = clip.get('frames_analyzed', 0) or 0  # Handle None
-        detection_method = clip.get('detection_method', 'n/a') or 'n/a'  # Handle None
-        processed_at = clip.get('processed_at', 'n/a') or 'n/a'  # Handle None
-
-        # Format processed_at if it's a string
-        if processed_at and isinstance(processed_at, str) and processed_at != 'n/a':
-            processed_at = processed_at[:19]  # Show only date and time, not microseconds
-
-        print(f"{filename:<35} | {is_car:<7} | {distraction_status:<10} | {car_ratio:<8.2f} | {frames_analyzed:<6} | {detection_method:<10} | {processed_at:<20}")
+    # Rows are formatted with one precompiled template and written in chunks
+    row_format = "{:<35} | {:<7} | {:<10} | {:<8.2f} | {:<6} | {:<10} | {:<20}\n".format
+    lines = []
+
+    # Pull all displayed columns out of each row with one call
+    row_fields = operator.itemgetter(*columns)
+    # SQLite stores booleans as 1/0 (True/False hash the same)
+    distraction_labels = {1: "Yes", 0: "No"}
+
+    for clip in itertools.chain([first_clip], clips):
+        filename, is_car, is_distracted, car_ratio, frames_analyzed, detection_method, processed_at = row_fields(clip)
+
+        filename = filename[:34] if filename else 'Unknown'  # Truncate if too long
+        is_car = "Yes" if is_car else "No"
+        distraction_status = distraction_labels.get(is_distracted, "Unknown")
+        car_ratio = car_ratio or 0  # Handle None
+        frames_analyzed = frames_analyzed or 0  # Handle None
+        detection_method = detection_method or 'n/a'  # Handle None
+        # Show only date and time, not microseconds
+        processed_at = processed_at[:19] if isinstance(processed_at, str) else 'n/a'
+
+        lines.append(row_format(filename, is_car, distraction_status, car_ratio, frames_analyzed, detection_method, processed_at))
+        if len(lines) >= 1000:
+            sys.stdout.write("".join(lines))
+            lines.clear()
 
+    sys.stdout.write("".join(lines))
     print("\nDone.")
 
 
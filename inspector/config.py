@@ -4,14 +4,33 @@ Configuration settings for the Inspector (analysis side)
 
 # Input/Output settings
 STORAGE_DIR = "downloaded_clips"  # Directory containing video clips to analyze
+VIDEO_EXTENSIONS = frozenset({".mp4", ".avi", ".mov", ".mkv"})  # Lower-case extensions treated as clips
 
 # Database settings
 DATABASE_PATH = "car_detection.db"  # SQLite database file path
+DB_BATCH_SIZE = 20  # Analysis results written to the database per transaction
 
 # YOLO model settings - using larger model for better accuracy on beefier machine
 MODEL_SIZE = 'x'  # Model size ('n'=nano, 's'=small, 'm'=medium, 'l'=large, 'x'=xlarge)
 CONFIDENCE_THRESHOLD = 0.5  # Minimum confidence for car detection
+SCREEN_MODEL_SIZE = None  # Smaller model that screens every frame first, e.g. 'n' (None = MODEL_SIZE only)
+SCREEN_CONFIDENCE_BAND = (0.3, 0.7)  # Screening confidences rechecked by MODEL_SIZE (below = no car, above = car)
 SAMPLE_FRAMES = 15  # Number of frames to sample for analysis (increased for better coverage)
+BATCH_SIZE = 8  # Sampled frames passed to YOLO per inference call
+EARLY_EXIT = False  # Stop analyzing a clip once enough frames with cars are found (faster, but car_ratio is stored as NULL)
+SEEK_MIN_GAP = 60  # Seek instead of decoding through gaps between sampled frames at least this long
+DECODER = 'opencv'  # Decoder for sampled frames ('opencv', 'pyav' for threaded libavcodec (`pip install av`), 'ffmpeg' subprocess, 'nvdec' = ffmpeg on the NVIDIA GPU decoder)
+FRAME_CACHE_DIR = None  # Directory caching each clip's sampled frames so reruns skip decoding, e.g. 'analysis_cache' (None = off)
+FRAME_CACHE_MAX_MB = 2048  # Frame cache size cap, least recently used clips are evicted first (~10 MB per clip)
+HW_DECODE = False  # Let the 'opencv' decoder use a hardware video decoder (VAAPI/NVDEC/V4L2 M2M) when OpenCV's FFmpeg supports one
+WORKERS = 1  # Worker processes for batch analysis (0 = one per CPU core, each loads its own model)
+WORKER_MEMORY_MB = 1024  # Memory budgeted per worker; fewer workers are started if available memory is short
+MODEL_FORMAT = 'pt'  # Inference runtime ('pt'=PyTorch, 'onnx'=ONNX Runtime, 'engine'=TensorRT, 'openvino', 'ncnn' for ARM/Raspberry Pi, exported on first run)
+PRECISION = 'fp32'  # Inference precision ('fp32', 'fp16' on GPU, 'int8' for exported formats)
+
+# Viewer settings
+PREFETCH_FRAMES = 8  # Frames decoded ahead of playback in view_car_clips.py
+VIEWER_MAX_FPS = 30  # Highest frame rate view_car_clips.py shows (faster clips skip frames)
 
 # Logging settings
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR
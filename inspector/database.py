@@ -5,11 +5,108 @@ Database module for storing car detection analysis results
 import sqlite3
 import os
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from pathlib import Path
 
 
+# Per-connection settings (journal_mode=WAL is set once in the file by _init_database)
+CONNECTION_PRAGMAS = (
+    'synchronous=NORMAL',  # Safe with WAL: commits skip the fsync, durable at checkpoint
+    'temp_store=MEMORY',  # Keep temporary sort/index structures off the SD card
+    'mmap_size=268435456',  # Read pages through a 256 MB memory map instead of read() calls
+    'cache_size=-65536',  # Page cache of up to 64 MB
+)
+
+# Insert a new analysis, or refresh the existing row for the same file in the same
+# statement (filename and recorded_at are derived from file_path, so they never change)
+UPSERT_ANALYSIS_SQL = """
+    INSERT INTO video_analysis (
+        filename, file_path, is_car, is_distracted, total_frames, duration,
+        frames_analyzed, frames_with_cars, car_ratio,
+        total_car_detections, average_cars_per_frame,
+        detection_method, confidence_threshold, min_car_frames,
+        error_message, recorded_at, file_size, file_mtime
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(file_path) DO UPDATE SET
+        is_car = excluded.is_car,
+        is_distracted = excluded.is_distracted,
+        total_frames = excluded.total_frames,
+        duration = excluded.duration,
+        frames_analyzed = excluded.frames_analyzed,
+        frames_with_cars = excluded.frames_with_cars,
+        car_ratio = excluded.car_ratio,
+        total_car_detections = excluded.total_car_detections,
+        average_cars_per_frame = excluded.average_cars_per_frame,
+        detection_method = excluded.detection_method,
+        confidence_threshold = excluded.confidence_threshold,
+        min_car_frames = excluded.min_car_frames,
+        processed_at = CURRENT_TIMESTAMP,
+        error_message = excluded.error_message,
+        file_size = excluded.file_size,
+        file_mtime = excluded.file_mtime
+"""
+
+# Stored in PRAGMA user_version once _migrate_schema has run; bump it whenever the
+# table, its columns or its indexes change so existing databases get migrated
+SCHEMA_VERSION = 3
+
+# Prepared statements kept per connection (Python's default is 128); the clip list
+# queries alone come in one variant per filter and ORDER BY column
+STATEMENT_CACHE_SIZE = 256
+
+# Columns that clip lists can be ordered by (newest first)
+ORDER_BY_COLUMNS = ('processed_at', 'recorded_at')
+
+# Columns that clip lists can select (None selects them all)
+CLIP_COLUMNS = (
+    'id', 'filename', 'file_path', 'is_car', 'is_distracted', 'total_frames', 'duration',
+    'frames_analyzed', 'frames_with_cars', 'car_ratio', 'total_car_detections',
+    'average_cars_per_frame', 'detection_method', 'confidence_threshold', 'min_car_frames',
+    'processed_at', 'error_message', 'recorded_at', 'file_size', 'file_mtime',
+)
+
+# Rows iter_clips pulls from SQLite per fetchmany call
+CLIP_FETCH_SIZE = 500
+
+# WHERE clauses for the named clip filters used by query_clips and iter_clips
+CLIP_FILTERS = {
+    'all': '1',
+    'cars': 'is_car = 1',
+    'no_cars': 'is_car = 0',
+    'distracted': 'is_distracted = 1',
+    'not_distracted': 'is_distracted = 0',
+    'classified': 'is_distracted IS NOT NULL',
+    'unanalyzed_distraction': 'is_car = 1 AND is_distracted IS NULL',
+}
+
+
+def recorded_at_from_filename(filename: str) -> Optional[str]:
+    """
+    Extract the recording time from a Watcher clip filename
+
+    Args:
+        filename: Clip filename like motion_20250626_124450_6s.mp4
+
+    Returns:
+        Timestamp string like '2025-06-26 12:44:50', or None if the name doesn't match
+    """
+    # Watcher clips are always named motion_YYYYMMDD_HHMMSS_..., so slice instead of regex + strptime
+    if not filename.startswith('motion_') or filename[15:16] != '_':
+        return None
+    date_str, time_str = filename[7:15], filename[16:22]
+    if not (date_str.isdigit() and time_str.isdigit() and len(time_str) == 6):
+        return None
+    try:
+        dt = datetime(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]),
+                      int(time_str[0:2]), int(time_str[2:4]), int(time_str[4:6]))
+    except ValueError:
+        return None
+    return dt.isoformat(sep=' ')
+
+
 class CarDetectionDB:
     """
     SQLite database for storing car detection analysis results
@@ -24,68 +121,178 @@ class CarDetectionDB:
         """
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
+
+        # One connection per thread, opened on first use and kept until close()
+        self._local = threading.local()
+        self._connections = {}  # thread -> connection
+        self._connections_lock = threading.Lock()
+
         self._init_database()
 
     def _init_database(self):
         """Initialize the database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
-            # Create video_analysis table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS video_analysis (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    filename TEXT NOT NULL,
-                    file_path TEXT NOT NULL UNIQUE,
-                    is_car BOOLEAN NOT NULL,
-                    is_distracted BOOLEAN DEFAULT NULL,
-                    total_frames INTEGER,
-                    duration REAL,
-                    frames_analyzed INTEGER,
-                    frames_with_cars INTEGER,
-                    car_ratio REAL,
-                    total_car_detections INTEGER,
-                    average_cars_per_frame REAL,
-                    detection_method TEXT,
-                    confidence_threshold REAL,
-                    min_car_frames INTEGER,
-                    processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    error_message TEXT,
-                    UNIQUE(file_path)
-                )
-            """)
+            # Schema changes only run when the file is older than this code; an up to
+            # date database skips straight to the planner statistics check
+            migrated = cursor.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION
+            if migrated:
+                self._migrate_schema(cursor)
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
-            # Check if is_distracted column exists, add it if it doesn't
-            cursor.execute("PRAGMA table_info(video_analysis)")
-            columns = [column[1] for column in cursor.fetchall()]
+            # New indexes have no statistics yet, so analyze right after a migration
+            self._refresh_planner_statistics(cursor, force=migrated)
 
-            if 'is_distracted' not in columns:
-                cursor.execute("""
-                    ALTER TABLE video_analysis
-                    ADD COLUMN is_distracted BOOLEAN DEFAULT NULL
-                """)
-                self.logger.info("Added is_distracted column to video_analysis table")
+            conn.commit()
+            self.logger.info(f"Database initialized: {self.db_path}")
 
-            # Create index on filename for faster lookups
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_filename
-                ON video_analysis(filename)
-            """)
+    def _migrate_schema(self, cursor: sqlite3.Cursor):
+        """
+        Create the table and indexes, and upgrade databases written by older versions
 
-            # Create index on is_car for filtering
+        Args:
+            cursor: Cursor of the connection initializing the database
+        """
+        # WAL lets the classifier read while the inspector writes (persists in the file)
+        cursor.execute("PRAGMA journal_mode=WAL")
+
+        # Create video_analysis table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS video_analysis (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT NOT NULL,
+                file_path TEXT NOT NULL UNIQUE,
+                is_car BOOLEAN NOT NULL,
+                is_distracted BOOLEAN DEFAULT NULL,
+                total_frames INTEGER,
+                duration REAL,
+                frames_analyzed INTEGER,
+                frames_with_cars INTEGER,
+                car_ratio REAL,
+                total_car_detections INTEGER,
+                average_cars_per_frame REAL,
+                detection_method TEXT,
+                confidence_threshold REAL,
+                min_car_frames INTEGER,
+                processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                error_message TEXT,
+                recorded_at TIMESTAMP DEFAULT NULL,
+                file_size INTEGER DEFAULT NULL,
+                file_mtime REAL DEFAULT NULL,
+                UNIQUE(file_path)
+            )
+        """)
+
+        # Add columns introduced after the table was first created
+        if self._add_column(cursor, 'is_distracted', 'BOOLEAN DEFAULT NULL'):
+            self.logger.info("Added is_distracted column to video_analysis table")
+
+        if self._add_column(cursor, 'recorded_at', 'TIMESTAMP DEFAULT NULL'):
+            # Backfill from motion_YYYYMMDD_HHMMSS_... filenames of existing clips
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_is_car
-                ON video_analysis(is_car)
+                UPDATE video_analysis
+                SET recorded_at = substr(filename, 8, 4) || '-' || substr(filename, 12, 2) || '-' ||
+                                  substr(filename, 14, 2) || ' ' || substr(filename, 17, 2) || ':' ||
+                                  substr(filename, 19, 2) || ':' || substr(filename, 21, 2)
+                WHERE filename GLOB 'motion_[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]_[0-9][0-9][0-9][0-9][0-9][0-9]*'
             """)
-
-            # Create index on is_distracted for filtering
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_is_distracted
-                ON video_analysis(is_distracted)
+            self.logger.info("Added recorded_at column to video_analysis table")
+
+        # Size and modification time of the clip when it was analyzed (NULL for
+        # clips analyzed before they were recorded, which count as unchanged)
+        if self._add_column(cursor, 'file_size', 'INTEGER DEFAULT NULL'):
+            self.logger.info("Added file_size column to video_analysis table")
+        if self._add_column(cursor, 'file_mtime', 'REAL DEFAULT NULL'):
+            self.logger.info("Added file_mtime column to video_analysis table")
+
+        # Create index on filename for faster lookups
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_filename
+            ON video_analysis(filename)
+        """)
+
+        # Composite indexes so filtered clip lists come back already ordered by
+        # recording time, without a temp B-tree sort (these supersede the old
+        # single-column is_car / is_distracted indexes)
+        cursor.execute("DROP INDEX IF EXISTS idx_is_car")
+        cursor.execute("DROP INDEX IF EXISTS idx_is_distracted")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_is_car_recorded_at
+            ON video_analysis(is_car, recorded_at)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_is_distracted_recorded_at
+            ON video_analysis(is_distracted, recorded_at)
+        """)
+
+        # Partial indexes serving the other filtered lists in their default processing
+        # order (SQLite only uses one when the query repeats its WHERE clause)
+        for clip_filter in ('cars', 'no_cars', 'distracted', 'not_distracted'):
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{clip_filter}_processed_at
+                ON video_analysis(processed_at) WHERE {CLIP_FILTERS[clip_filter]}
             """)
 
-            conn.commit()
-            self.logger.info(f"Database initialized: {self.db_path}")
+        # Partial index holding just the clips still waiting for distraction analysis,
+        # in processing order (by recording time, idx_is_distracted_recorded_at covers it)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_unanalyzed_processed_at
+            ON video_analysis(processed_at) WHERE is_car = 1 AND is_distracted IS NULL
+        """)
+
+        # Create index on recorded_at for ordering clip lists by recording time
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_recorded_at
+            ON video_analysis(recorded_at)
+        """)
+
+    def _add_column(self, cursor: sqlite3.Cursor, name: str, definition: str) -> bool:
+        """
+        Add a column to video_analysis unless it is already there
+
+        Args:
+            cursor: Cursor of the connection initializing the database
+            name: Column name
+            definition: Column type and constraints
+
+        Returns:
+            True if the column was added, False if it already existed
+        """
+        try:
+            cursor.execute(f"ALTER TABLE video_analysis ADD COLUMN {name} {definition}")
+            return True
+        except sqlite3.OperationalError as e:
+            # Tables created by this version already have every column
+            if 'duplicate column name' not in str(e):
+                raise
+            return False
+
+    def _refresh_planner_statistics(self, cursor: sqlite3.Cursor, force: bool = False):
+        """
+        Run ANALYZE when the table has grown or shrunk a lot since it was last analyzed
+
+        Without sqlite_stat1 the query planner can't tell that the partial and
+        composite indexes are selective and may pick a plain is_car index instead.
+
+        Args:
+            cursor: Cursor of the connection initializing the database
+            force: Analyze even if the row count hasn't changed much
+        """
+        row_count = cursor.execute("SELECT COUNT(*) FROM video_analysis").fetchone()[0]
+        if row_count == 0:
+            return
+
+        analyzed_count = 0
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            # The first number of a full (non-partial) index's stat is the table's row count
+            stat = cursor.execute("SELECT stat FROM sqlite_stat1 WHERE idx = 'idx_filename'").fetchone()
+            if stat:
+                analyzed_count = int(stat[0].split()[0])
+
+        if force or not analyzed_count or not analyzed_count / 2 <= row_count <= analyzed_count * 2:
+            cursor.execute("ANALYZE video_analysis")
+            self.logger.debug(f"Refreshed query planner statistics ({row_count} rows)")
 
     def save_analysis_result(self, analysis_result: Dict) -> bool:
         """
@@ -97,89 +304,66 @@ class CarDetectionDB:
         Returns:
             True if saved successfully, False otherwise
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+        return self.save_analysis_results([analysis_result])
 
-                # Check if file already exists
-                cursor.execute(
-                    "SELECT id FROM video_analysis WHERE file_path = ?",
-                    (analysis_result.get('video_path', ''),)
-                )
-                existing = cursor.fetchone()
-
-                if existing:
-                    # Update existing record
-                    cursor.execute("""
-                        UPDATE video_analysis SET
-                            is_car = ?,
-                            is_distracted = ?,
-                            total_frames = ?,
-                            duration = ?,
-                            frames_analyzed = ?,
-                            frames_with_cars = ?,
-                            car_ratio = ?,
-                            total_car_detections = ?,
-                            average_cars_per_frame = ?,
-                            detection_method = ?,
-                            confidence_threshold = ?,
-                            min_car_frames = ?,
-                            processed_at = CURRENT_TIMESTAMP,
-                            error_message = ?
-                        WHERE file_path = ?
-                    """, (
-                        analysis_result.get('has_cars', False),
-                        analysis_result.get('is_distracted'),
-                        analysis_result.get('total_frames'),
-                        analysis_result.get('duration'),
-                        analysis_result.get('frames_analyzed'),
-                        analysis_result.get('frames_with_cars'),
-                        analysis_result.get('car_ratio'),
-                        analysis_result.get('total_car_detections'),
-                        analysis_result.get('average_cars_per_frame'),
-                        analysis_result.get('detection_method'),
-                        analysis_result.get('confidence_threshold'),
-                        analysis_result.get('min_car_frames'),
-                        analysis_result.get('error'),
-                        analysis_result.get('video_path', '')
-                    ))
-                    self.logger.debug(f"Updated analysis for: {analysis_result.get('video_path')}")
-                else:
-                    # Insert new record
-                    cursor.execute("""
-                        INSERT INTO video_analysis (
-                            filename, file_path, is_car, is_distracted, total_frames, duration,
-                            frames_analyzed, frames_with_cars, car_ratio,
-                            total_car_detections, average_cars_per_frame,
-                            detection_method, confidence_threshold, min_car_frames,
-                            error_message
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        os.path.basename(analysis_result.get('video_path', 'unknown')),
-                        analysis_result.get('video_path', ''),
-                        analysis_result.get('has_cars', False),
-                        analysis_result.get('is_distracted'),
-                        analysis_result.get('total_frames'),
-                        analysis_result.get('duration'),
-                        analysis_result.get('frames_analyzed'),
-                        analysis_result.get('frames_with_cars'),
-                        analysis_result.get('car_ratio'),
-                        analysis_result.get('total_car_detections'),
-                        analysis_result.get('average_cars_per_frame'),
-                        analysis_result.get('detection_method'),
-                        analysis_result.get('confidence_threshold'),
-                        analysis_result.get('min_car_frames'),
-                        analysis_result.get('error')
-                    ))
-                    self.logger.debug(f"Saved analysis for: {analysis_result.get('video_path')}")
-
-                conn.commit()
+    def save_analysis_results(self, analysis_results: List[Dict]) -> bool:
+        """
+        Save several analysis results in a single transaction
+
+        Args:
+            analysis_results: List of dictionaries containing analysis results
+
+        Returns:
+            True if all results were saved, False otherwise (nothing is saved)
+        """
+        try:
+            rows = [self._analysis_row(result) for result in analysis_results]
+            with self._write_transaction() as conn:
+                conn.executemany(UPSERT_ANALYSIS_SQL, rows)
+                self.logger.debug(f"Saved {len(analysis_results)} analysis results")
                 return True
 
         except Exception as e:
-            self.logger.error(f"Error saving analysis result: {e}")
+            self.logger.error(f"Error saving analysis results: {e}")
             return False
 
+    def _analysis_row(self, analysis_result: Dict) -> Tuple:
+        """
+        Build the UPSERT_ANALYSIS_SQL parameters for one analysis result
+
+        Args:
+            analysis_result: Dictionary containing analysis results
+
+        Returns:
+            Tuple of column values in UPSERT_ANALYSIS_SQL order
+        """
+        video_path = analysis_result.get('video_path')
+        if video_path is None:
+            filename, video_path = 'unknown', ''
+        else:
+            # Same as os.path.basename for the POSIX paths the inspector stores
+            filename = video_path.rpartition(os.sep)[2]
+        return (
+            filename,
+            video_path,
+            analysis_result.get('has_cars', False),
+            analysis_result.get('is_distracted'),
+            analysis_result.get('total_frames'),
+            analysis_result.get('duration'),
+            analysis_result.get('frames_analyzed'),
+            analysis_result.get('frames_with_cars'),
+            analysis_result.get('car_ratio'),
+            analysis_result.get('total_car_detections'),
+            analysis_result.get('average_cars_per_frame'),
+            analysis_result.get('detection_method'),
+            analysis_result.get('confidence_threshold'),
+            analysis_result.get('min_car_frames'),
+            analysis_result.get('error'),
+            recorded_at_from_filename(filename),
+            analysis_result.get('file_size'),
+            analysis_result.get('file_mtime')
+        )
+
     def get_analysis_by_filename(self, filename: str) -> Optional[Dict]:
         """
         Get analysis result by filename
@@ -191,7 +375,7 @@ class CarDetectionDB:
             Analysis result dictionary or None if not found
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT * FROM video_analysis WHERE filename = ?
@@ -199,7 +383,7 @@ class CarDetectionDB:
 
                 row = cursor.fetchone()
                 if row:
-                    return self._row_to_dict(row)
+                    return dict(row)
                 return None
 
         except Exception as e:
@@ -217,7 +401,7 @@ class CarDetectionDB:
             Analysis result dictionary or None if not found
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT * FROM video_analysis WHERE file_path = ?
@@ -225,174 +409,215 @@ class CarDetectionDB:
 
                 row = cursor.fetchone()
                 if row:
-                    return self._row_to_dict(row)
+                    return dict(row)
                 return None
 
         except Exception as e:
             self.logger.error(f"Error getting analysis by path: {e}")
             return None
 
-    def get_all_analyses(self, limit: Optional[int] = None) -> List[Dict]:
+    def get_analyses_by_paths(self, file_paths: List[str]) -> Dict[str, Dict]:
         """
-        Get all analysis results
+        Get analysis results for many file paths at once
 
         Args:
-            limit: Maximum number of results to return
+            file_paths: Full paths to the video files
 
         Returns:
-            List of analysis result dictionaries
+            Dictionary mapping file path to analysis result (missing paths are left out)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
+                self._load_probe_paths(cursor, file_paths)
+                cursor.execute("""
+                    SELECT video_analysis.* FROM probe_paths
+                    JOIN video_analysis ON video_analysis.file_path = probe_paths.file_path
+                """)
+                analyses = {}
+                for row in cursor.fetchall():
+                    analysis = dict(row)
+                    analyses[analysis['file_path']] = analysis
+                return analyses
 
-                query = "SELECT * FROM video_analysis ORDER BY processed_at DESC"
-                if limit:
-                    query += f" LIMIT {limit}"
+        except Exception as e:
+            self.logger.error(f"Error getting analyses by paths: {e}")
+            return {}
 
-                cursor.execute(query)
-                rows = cursor.fetchall()
+    def get_all_analyses(self, limit: Optional[int] = None, order_by: str = 'processed_at',
+                         columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Get all analysis results (iter_clips('all') streams them instead)
 
-                return [self._row_to_dict(row) for row in rows]
+        Args:
+            limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
 
-        except Exception as e:
-            self.logger.error(f"Error getting all analyses: {e}")
-            return []
+        Returns:
+            List of analysis result dictionaries
+        """
+        return self.query_clips('all', limit, order_by, columns)
 
-    def get_car_clips(self, limit: Optional[int] = None) -> List[Dict]:
+    def get_car_clips(self, limit: Optional[int] = None, order_by: str = 'processed_at',
+                      columns: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Get all clips that contain cars
 
         Args:
             limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
 
         Returns:
             List of analysis result dictionaries for clips with cars
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                query = "SELECT * FROM video_analysis WHERE is_car = 1 ORDER BY processed_at DESC"
-                if limit:
-                    query += f" LIMIT {limit}"
+        return self.query_clips('cars', limit, order_by, columns)
 
-                cursor.execute(query)
-                rows = cursor.fetchall()
-
-                return [self._row_to_dict(row) for row in rows]
-
-        except Exception as e:
-            self.logger.error(f"Error getting car clips: {e}")
-            return []
-
-    def get_no_car_clips(self, limit: Optional[int] = None) -> List[Dict]:
+    def get_no_car_clips(self, limit: Optional[int] = None, order_by: str = 'processed_at',
+                         columns: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Get all clips that don't contain cars
 
         Args:
             limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
 
         Returns:
             List of analysis result dictionaries for clips without cars
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                query = "SELECT * FROM video_analysis WHERE is_car = 0 ORDER BY processed_at DESC"
-                if limit:
-                    query += f" LIMIT {limit}"
-
-                cursor.execute(query)
-                rows = cursor.fetchall()
-
-                return [self._row_to_dict(row) for row in rows]
-
-        except Exception as e:
-            self.logger.error(f"Error getting no-car clips: {e}")
-            return []
+        return self.query_clips('no_cars', limit, order_by, columns)
 
-    def get_distracted_clips(self, limit: Optional[int] = None) -> List[Dict]:
+    def get_distracted_clips(self, limit: Optional[int] = None, order_by: str = 'processed_at',
+                             columns: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Get all clips where driver is distracted
 
         Args:
             limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
 
         Returns:
             List of analysis result dictionaries for clips with distracted drivers
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                query = "SELECT * FROM video_analysis WHERE is_distracted = 1 ORDER BY processed_at DESC"
-                if limit:
-                    query += f" LIMIT {limit}"
-
-                cursor.execute(query)
-                rows = cursor.fetchall()
-
-                return [self._row_to_dict(row) for row in rows]
-
-        except Exception as e:
-            self.logger.error(f"Error getting distracted clips: {e}")
-            return []
+        return self.query_clips('distracted', limit, order_by, columns)
 
-    def get_not_distracted_clips(self, limit: Optional[int] = None) -> List[Dict]:
+    def get_not_distracted_clips(self, limit: Optional[int] = None, order_by: str = 'processed_at',
+                                 columns: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Get all clips where driver is not distracted
 
         Args:
             limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
 
         Returns:
             List of analysis result dictionaries for clips with non-distracted drivers
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                query = "SELECT * FROM video_analysis WHERE is_distracted = 0 ORDER BY processed_at DESC"
-                if limit:
-                    query += f" LIMIT {limit}"
+        return self.query_clips('not_distracted', limit, order_by, columns)
 
-                cursor.execute(query)
-                rows = cursor.fetchall()
+    def get_classified_clips(self, limit: Optional[int] = None, order_by: str = 'processed_at',
+                             columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Get all clips that have been analyzed for distraction (distracted or not)
 
-                return [self._row_to_dict(row) for row in rows]
+        Args:
+            limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
 
-        except Exception as e:
-            self.logger.error(f"Error getting not-distracted clips: {e}")
-            return []
+        Returns:
+            List of analysis result dictionaries for classified clips
+        """
+        return self.query_clips('classified', limit, order_by, columns)
 
-    def get_unanalyzed_distraction_clips(self, limit: Optional[int] = None) -> List[Dict]:
+    def get_unanalyzed_distraction_clips(self, limit: Optional[int] = None, order_by: str = 'processed_at',
+                                         columns: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Get all clips that have cars but haven't been analyzed for distraction yet
 
         Args:
             limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
 
         Returns:
             List of analysis result dictionaries for clips needing distraction analysis
         """
+        return self.query_clips('unanalyzed_distraction', limit, order_by, columns)
+
+    def query_clips(self, clip_filter: str = 'all', limit: Optional[int] = None,
+                    order_by: str = 'processed_at', columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Get clips matching a named filter
+
+        Args:
+            clip_filter: One of the CLIP_FILTERS names
+            limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
+
+        Returns:
+            List of analysis result dictionaries
+        """
+        query, params = self._clips_query(clip_filter, limit, order_by, columns)
+
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
+                cursor.execute(query, params)
+                return [dict(row) for row in cursor.fetchall()]
 
-                query = "SELECT * FROM video_analysis WHERE is_car = 1 AND is_distracted IS NULL ORDER BY processed_at DESC"
-                if limit:
-                    query += f" LIMIT {limit}"
+        except Exception as e:
+            self.logger.error(f"Error getting {clip_filter} clips: {e}")
+            return []
 
-                cursor.execute(query)
-                rows = cursor.fetchall()
+    def iter_clips(self, clip_filter: str = 'all', limit: Optional[int] = None,
+                   order_by: str = 'processed_at', columns: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+        """
+        Iterate over clips matching a named filter without loading them all at once
 
-                return [self._row_to_dict(row) for row in rows]
+        Args:
+            clip_filter: One of the CLIP_FILTERS names
+            limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
+
+        Yields:
+            Analysis result dictionaries, one row at a time
+        """
+        query, params = self._clips_query(clip_filter, limit, order_by, columns)
+
+        try:
+            with self._connect() as conn:
+                # Rows are fetched from the cursor in batches as they are consumed
+                cursor = conn.execute(query, params)
+                while rows := cursor.fetchmany(CLIP_FETCH_SIZE):
+                    yield from map(dict, rows)
 
         except Exception as e:
-            self.logger.error(f"Error getting unanalyzed distraction clips: {e}")
-            return []
+            self.logger.error(f"Error iterating {clip_filter} clips: {e}")
+
+    def explain_clips_query(self, clip_filter: str = 'all', limit: Optional[int] = None,
+                            order_by: str = 'processed_at', columns: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Get SQLite's query plan for a query_clips/iter_clips call
+
+        Args:
+            clip_filter: One of the CLIP_FILTERS names
+            limit: Maximum number of results to return
+            order_by: Column to sort by, newest first ('processed_at' or 'recorded_at')
+            columns: Columns to select (defaults to all of CLIP_COLUMNS)
+
+        Returns:
+            List of query plan steps (e.g. 'SEARCH video_analysis USING INDEX ...')
+        """
+        query, params = self._clips_query(clip_filter, limit, order_by, columns)
+        with self._connect() as conn:
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
 
     def update_distraction_analysis(self, file_path: str, is_distracted: bool) -> bool:
         """
@@ -405,27 +630,36 @@ class CarDetectionDB:
         Returns:
             True if updated successfully, False otherwise
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+        if self.update_distraction_analyses([(file_path, is_distracted)]) > 0:
+            self.logger.debug(f"Updated distraction analysis for: {file_path}")
+            return True
 
-                cursor.execute("""
+        self.logger.warning(f"No record found for: {file_path}")
+        return False
+
+    def update_distraction_analyses(self, updates: Iterable[Tuple[str, Optional[bool]]]) -> int:
+        """
+        Update the distraction analysis for several files in a single transaction
+
+        Args:
+            updates: (file_path, is_distracted) pairs
+
+        Returns:
+            Number of records updated (0 on error)
+        """
+        try:
+            rows = [(is_distracted, file_path) for file_path, is_distracted in updates]
+            with self._write_transaction() as conn:
+                cursor = conn.executemany("""
                     UPDATE video_analysis
                     SET is_distracted = ?, processed_at = CURRENT_TIMESTAMP
                     WHERE file_path = ?
-                """, (is_distracted, file_path))
-
-                if cursor.rowcount > 0:
-                    conn.commit()
-                    self.logger.debug(f"Updated distraction analysis for: {file_path}")
-                    return True
-                else:
-                    self.logger.warning(f"No record found for: {file_path}")
-                    return False
+                """, rows)
+                return cursor.rowcount
 
         except Exception as e:
             self.logger.error(f"Error updating distraction analysis: {e}")
-            return False
+            return 0
 
     def get_statistics(self) -> Dict:
         """
@@ -435,35 +669,25 @@ class CarDetectionDB:
             Dictionary with statistics
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
 
-                # Get total counts
-                cursor.execute("SELECT COUNT(*) FROM video_analysis")
-                total_clips = cursor.fetchone()[0]
-
-                cursor.execute("SELECT COUNT(*) FROM video_analysis WHERE is_car = 1")
-                with_cars = cursor.fetchone()[0]
-
-                cursor.execute("SELECT COUNT(*) FROM video_analysis WHERE is_car = 0")
-                without_cars = cursor.fetchone()[0]
-
-                cursor.execute("SELECT COUNT(*) FROM video_analysis WHERE error_message IS NOT NULL")
-                errors = cursor.fetchone()[0]
-
-                # Get distraction statistics
-                cursor.execute("SELECT COUNT(*) FROM video_analysis WHERE is_distracted = 1")
-                distracted = cursor.fetchone()[0]
-
-                cursor.execute("SELECT COUNT(*) FROM video_analysis WHERE is_distracted = 0")
-                not_distracted = cursor.fetchone()[0]
-
-                cursor.execute("SELECT COUNT(*) FROM video_analysis WHERE is_car = 1 AND is_distracted IS NULL")
-                unanalyzed_distraction = cursor.fetchone()[0]
-
-                # Get average car ratio
-                cursor.execute("SELECT AVG(car_ratio) FROM video_analysis WHERE is_car = 1")
-                avg_car_ratio = cursor.fetchone()[0] or 0
+                # Gather every count in a single pass over the table
+                cursor.execute("""
+                    SELECT
+                        COUNT(*),
+                        COALESCE(SUM(is_car = 1), 0),
+                        COALESCE(SUM(is_car = 0), 0),
+                        COALESCE(SUM(error_message IS NOT NULL), 0),
+                        COALESCE(SUM(is_distracted = 1), 0),
+                        COALESCE(SUM(is_distracted = 0), 0),
+                        COALESCE(SUM(is_car = 1 AND is_distracted IS NULL), 0),
+                        AVG(CASE WHEN is_car = 1 THEN car_ratio END)
+                    FROM video_analysis
+                """)
+                (total_clips, with_cars, without_cars, errors, distracted,
+                 not_distracted, unanalyzed_distraction, avg_car_ratio) = cursor.fetchone()
+                avg_car_ratio = avg_car_ratio or 0
 
                 return {
                     'total_clips': total_clips,
@@ -504,7 +728,7 @@ class CarDetectionDB:
             True if file has been processed, False otherwise
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT id FROM video_analysis WHERE file_path = ?
@@ -518,7 +742,11 @@ class CarDetectionDB:
 
     def get_unprocessed_files(self, file_paths: List[str]) -> List[str]:
         """
-        Get list of files that haven't been processed yet
+        Get list of files that haven't been processed yet, or have changed since
+
+        A file counts as changed when its size or modification time differs from
+        the one stored with its analysis. Files that can't be stat'ed and analyses
+        stored without a size are compared by path only.
 
         Args:
             file_paths: List of file paths to check
@@ -527,54 +755,191 @@ class CarDetectionDB:
             List of file paths that haven't been processed
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            probe_files = []
+            for path in file_paths:
+                try:
+                    stat = os.stat(path)
+                    probe_files.append((path, stat.st_size, stat.st_mtime))
+                except OSError:
+                    probe_files.append((path, None, None))
+
+            with self._connect() as conn:
                 cursor = conn.cursor()
-
-                # Create placeholders for the IN clause
-                placeholders = ','.join(['?' for _ in file_paths])
-                cursor.execute(f"""
-                    SELECT file_path FROM video_analysis
-                    WHERE file_path IN ({placeholders})
-                """, file_paths)
-
+                cursor.execute("""
+                    CREATE TEMP TABLE IF NOT EXISTS probe_files
+                    (file_path TEXT PRIMARY KEY, file_size INTEGER, file_mtime REAL)
+                """)
+                cursor.execute("DELETE FROM probe_files")
+                cursor.executemany("INSERT OR IGNORE INTO probe_files VALUES (?, ?, ?)", probe_files)
+                cursor.execute("""
+                    SELECT probe_files.file_path FROM probe_files
+                    JOIN video_analysis ON video_analysis.file_path = probe_files.file_path
+                    WHERE probe_files.file_size IS NULL OR video_analysis.file_size IS NULL
+                       OR (video_analysis.file_size = probe_files.file_size
+                           AND video_analysis.file_mtime = probe_files.file_mtime)
+                """)
                 processed_paths = {row[0] for row in cursor.fetchall()}
+
                 return [path for path in file_paths if path not in processed_paths]
 
         except Exception as e:
             self.logger.error(f"Error getting unprocessed files: {e}")
             return file_paths
 
-    def _row_to_dict(self, row: Tuple) -> Dict:
+    def _load_probe_paths(self, cursor: sqlite3.Cursor, file_paths: List[str]):
+        """
+        Fill this connection's probe_paths temp table with the given paths
+
+        Joining against a temp table keeps the lookup SQL constant (so its prepared
+        statement is reused) and has no bind parameter limit, unlike IN (?, ?, ...).
+
+        Args:
+            cursor: Cursor of the connection doing the lookup
+            file_paths: Paths to look up
+        """
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS probe_paths (file_path TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM probe_paths")
+        cursor.executemany("INSERT OR IGNORE INTO probe_paths VALUES (?)", ((path,) for path in file_paths))
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Get this thread's connection to the database, opening it on first use
+
+        Callers use it as 'with self._connect() as conn:', which commits (or rolls
+        back) the transaction but leaves the connection open for the next call.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so connections can be closed from other threads.
+            # sqlite3 keeps prepared statements per connection keyed by SQL text, so with
+            # long-lived connections every fixed query below is only compiled once.
+            conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            # Rows map column names to values straight from the cursor, whatever the
+            # physical column order (migrations append columns at the end)
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(f"PRAGMA {pragma}")
+            self._local.conn = conn
+            with self._connections_lock:
+                # Close connections left behind by threads that have exited
+                # (e.g. a server that starts a thread per request)
+                for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block of writes in a transaction that takes the write lock up front
+
+        A deferred transaction only asks for the lock at its first write and then
+        fails with SQLITE_BUSY if another process got there first; BEGIN IMMEDIATE
+        waits for the lock (up to the connection timeout) before doing any work.
+
+        Yields:
+            This thread's connection, committed when the block ends (rolled back on error)
         """
-        Convert database row to dictionary
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            yield conn
+
+    def _clips_query(self, clip_filter: str, limit: Optional[int], order_by: str,
+                     columns: Optional[Sequence[str]] = None) -> Tuple[str, Tuple]:
+        """
+        Build the SELECT for a named clip filter
 
         Args:
-            row: Database row tuple
+            clip_filter: One of the CLIP_FILTERS names
+            limit: Maximum number of results to return (None or 0 for all)
+            order_by: Column to sort by, newest first
+            columns: Columns to select (None for all)
 
         Returns:
-            Dictionary representation of the row
+            Tuple of (query, bind parameters)
         """
-        columns = [
-            'id', 'filename', 'file_path', 'is_car', 'total_frames', 'duration',
-            'frames_analyzed', 'frames_with_cars', 'car_ratio', 'total_car_detections',
-            'average_cars_per_frame', 'detection_method', 'confidence_threshold',
-            'min_car_frames', 'processed_at', 'error_message', 'is_distracted'
-        ]
+        if clip_filter not in CLIP_FILTERS:
+            raise ValueError(f"Unknown clip filter: {clip_filter}")
 
-        return dict(zip(columns, row))
+        query = (f"SELECT {self._select_list(columns)} FROM video_analysis "
+                 f"WHERE {CLIP_FILTERS[clip_filter]} "
+                 f"ORDER BY {self._order_column(order_by)} DESC LIMIT ?")
+        # LIMIT -1 means no limit in SQLite
+        return query, (limit or -1,)
+
+    def _select_list(self, columns: Optional[Sequence[str]]) -> str:
+        """
+        Validate the column names used in a SELECT list
 
-    def clear_database(self):
-        """Clear all data from the database"""
+        Args:
+            columns: Requested column names (None for all)
+
+        Returns:
+            Comma-separated column list for the query
+        """
+        if columns is None:
+            return '*'
+        unknown = [column for column in columns if column not in CLIP_COLUMNS]
+        if unknown or not columns:
+            raise ValueError(f"Cannot select clip columns: {unknown or columns}")
+        return ', '.join(columns)
+
+    def _order_column(self, order_by: str) -> str:
+        """
+        Validate a column name used in an ORDER BY clause
+
+        Args:
+            order_by: Requested column name
+
+        Returns:
+            The column name if it is allowed
+        """
+        if order_by not in ORDER_BY_COLUMNS:
+            raise ValueError(f"Cannot order clips by: {order_by}")
+        return order_by
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Skip fsyncs on this thread's connection while a large sweep saves its results
+
+        With synchronous=OFF even WAL checkpoints don't wait for the SD card, at the
+        cost that a power cut during the sweep can corrupt the database. WAL stays
+        on so the classifier keeps reading and failed batches still roll back.
+        """
+        conn = self._connect()
+        previous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        conn.execute("PRAGMA synchronous=OFF")
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM video_analysis")
-                conn.commit()
-                self.logger.info("Database cleared")
+            yield
+        finally:
+            conn.execute(f"PRAGMA synchronous={previous}")
+
+    def clear_database(self, shrink: bool = False):
+        """
+        Clear all data from the database
+
+        Args:
+            shrink: Also VACUUM so the file shrinks (rewrites the whole database)
+        """
+        try:
+            with self._write_transaction() as conn:
+                conn.execute("DELETE FROM video_analysis")
+                # Restart AUTOINCREMENT ids at 1
+                conn.execute("DELETE FROM sqlite_sequence WHERE name = 'video_analysis'")
+            if shrink:
+                # VACUUM can't run inside a transaction; the block above has committed
+                self._connect().execute("VACUUM")
+            self.logger.info("Database cleared")
         except Exception as e:
             self.logger.error(f"Error clearing database: {e}")
 
     def close(self):
-        """Close database connection"""
-        # SQLite connections are automatically closed when using context managers
-        pass
\ No newline at end of file
+        """Close the database connections of all threads"""
+        with self._connections_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
\ No newline at end of file
@@ -8,7 +8,9 @@ import sys
 import logging
 import signal
 import argparse
-from yolo_car_detector import YOLOCarDetector
+import contextlib
+import threading
+from collections import Counter
 import config
 
 
@@ -24,10 +26,14 @@ def setup_logging():
     )
 
 
+# Set on Ctrl-C/SIGTERM; processing stops at the next clip and saves what it has
+shutdown = threading.Event()
+
+
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
-    print("\nShutdown signal received. Exiting gracefully...")
-    sys.exit(0)
+    print("\nShutdown signal received. Finishing the current clip and exiting gracefully...")
+    shutdown.set()
 
 
 def main():
@@ -39,16 +45,46 @@ def main():
     parser = argparse.ArgumentParser(description='Run YOLOv8 car detection on video clips')
     parser.add_argument('--model-size', choices=['n', 's', 'm', 'l', 'x'], default=config.MODEL_SIZE,
                        help=f'YOLO model size (default: {config.MODEL_SIZE})')
+    parser.add_argument('--screen-model-size', choices=['n', 's', 'm', 'l', 'x'], default=config.SCREEN_MODEL_SIZE,
+                       help='Smaller YOLO model that screens every frame, only unsure frames reach --model-size '
+                            f'(default: {config.SCREEN_MODEL_SIZE})')
+    parser.add_argument('--screen-band', type=float, nargs=2, metavar=('LOW', 'HIGH'),
+                       default=config.SCREEN_CONFIDENCE_BAND,
+                       help='Screening confidences rechecked by --model-size '
+                            f'(default: {config.SCREEN_CONFIDENCE_BAND[0]} {config.SCREEN_CONFIDENCE_BAND[1]})')
     parser.add_argument('--source-dir', type=str, default=config.STORAGE_DIR,
                        help=f'Source directory containing video clips (default: {config.STORAGE_DIR})')
     parser.add_argument('--force', action='store_true',
                        help='Force reprocessing of files even if they have already been analyzed')
+    parser.add_argument('--workers', type=int, default=config.WORKERS,
+                       help=f'Worker processes for analysis, 0 = one per CPU core (default: {config.WORKERS})')
+    parser.add_argument('--batch-size', type=int, default=config.BATCH_SIZE,
+                       help=f'Sampled frames per YOLO inference call, {config.SAMPLE_FRAMES} or more '
+                            f'runs each clip in one call (default: {config.BATCH_SIZE})')
+    parser.add_argument('--model-format', choices=['pt', 'onnx', 'engine', 'openvino', 'ncnn'], default=config.MODEL_FORMAT,
+                       help=f'Inference runtime, exported from the .pt weights on first use (default: {config.MODEL_FORMAT})')
+    parser.add_argument('--precision', choices=['fp32', 'fp16', 'int8'], default=config.PRECISION,
+                       help=f'Inference precision (default: {config.PRECISION})')
+    parser.add_argument('--decoder', choices=['opencv', 'pyav', 'ffmpeg', 'nvdec'], default=config.DECODER,
+                       help=f'Video decoder for sampled frames (default: {config.DECODER})')
+    parser.add_argument('--early-exit', action='store_true', default=config.EARLY_EXIT,
+                       help='Stop analyzing a clip once it clearly has cars (faster, but no car ratio is stored)')
+    parser.add_argument('--hw-decode', action='store_true', default=config.HW_DECODE,
+                       help='Decode with a hardware video decoder when OpenCV supports one (opencv decoder only)')
+    parser.add_argument('--cache-dir', type=str, default=config.FRAME_CACHE_DIR,
+                       help='Cache sampled frames here so --force reruns (e.g. with another --model-size) '
+                            f'skip decoding (default: {config.FRAME_CACHE_DIR})')
+    parser.add_argument('--bulk-load', action='store_true',
+                       help='Skip database fsyncs during the run (faster first sweep, '
+                            'but a power cut can corrupt the database and its classifications)')
     args = parser.parse_args()
 
     setup_logging()
     logger = logging.getLogger(__name__)
 
     logger.info(f"Starting YOLOv8 car detection analysis using model size: {args.model_size}")
+    if args.screen_model_size:
+        logger.info(f"Screening frames with model size {args.screen_model_size} first")
     logger.info(f"Source directory: {args.source_dir}")
     logger.info(f"Database: {config.DATABASE_PATH}")
     logger.info("Press Ctrl-C to stop processing gracefully (progress will be saved to database)")
@@ -59,33 +95,41 @@ def main():
         sys.exit(1)
 
     # Check if there are any video files
-    video_files = [f for f in os.listdir(args.source_dir)
-                   if f.lower().endswith(('.mp4', '.avi', '.mov', '.mkv'))]
+    with os.scandir(args.source_dir) as entries:
+        video_files = [entry.name for entry in entries
+                       if entry.is_file() and os.path.splitext(entry.name)[1].lower() in config.VIDEO_EXTENSIONS]
 
     if not video_files:
         logger.warning(f"No video files found in {args.source_dir}")
         sys.exit(0)
 
     # Check for duplicate filenames in the source directory
-    filename_counts = {}
-    for video_file in video_files:
-        filename_counts[video_file] = filename_counts.get(video_file, 0) + 1
-
-    duplicates = [filename for filename, count in filename_counts.items() if count > 1]
+    duplicates = {filename: count for filename, count in Counter(video_files).items() if count > 1}
     if duplicates:
         logger.warning(f"Found {len(duplicates)} duplicate filenames in source directory:")
-        for duplicate in duplicates:
-            logger.warning(f"  - {duplicate} (appears {filename_counts[duplicate]} times)")
+        for duplicate, count in duplicates.items():
+            logger.warning(f"  - {duplicate} (appears {count} times)")
         logger.warning("This could cause issues during processing. Consider removing duplicates.")
 
     logger.info(f"Found {len(video_files)} video files to analyze")
 
+    # Imported only once there is work to do: it pulls in OpenCV, ultralytics and
+    # torch, which take seconds to load just to print --help or report a bad directory
+    from yolo_car_detector import YOLOCarDetector
+
     # Initialize YOLO car detector
-    detector = YOLOCarDetector(model_size=args.model_size, force=args.force)
+    detector = YOLOCarDetector(model_size=args.model_size, force=args.force, workers=args.workers,
+                                batch_size=args.batch_size, model_format=args.model_format,
+                                precision=args.precision, decoder=args.decoder,
+                                screen_model_size=args.screen_model_size, screen_band=tuple(args.screen_band),
+                                cache_dir=args.cache_dir, hw_decode=args.hw_decode,
+                                early_exit=args.early_exit)
 
     # Process all clips
     try:
-        results = detector.process_all_clips(input_dir=args.source_dir)
+        with detector.db.bulk_load() if args.bulk_load else contextlib.nullcontext():
+            results = detector.process_all_clips(input_dir=args.source_dir, files=video_files,
+                                                 cancel_event=shutdown)
 
         # Print summary to console
         summary = detector.create_summary_report(results)
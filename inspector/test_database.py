@@ -5,7 +5,7 @@ Test script for database functionality
 
 import os
 import tempfile
-from database import CarDetectionDB
+from database import CarDetectionDB, SCHEMA_VERSION
 import config
 
 
@@ -139,8 +139,16 @@ def test_database():
             print("❌ No-car clips retrieval failed")
             return False
 
+        streamed_clips = list(db.iter_clips('cars', limit=1))
+        if len(streamed_clips) == 1 and streamed_clips[0]['is_car']:
+            print("✅ Clips streamed correctly")
+        else:
+            print("❌ Clip streaming failed")
+            return False
+
         distracted_clips = db.get_distracted_clips()
-        if len(distracted_clips) == 1 and distracted_clips[0]['filename'] == 'video3.mp4':
+        if (len(distracted_clips) == 1 and distracted_clips[0]['filename'] == 'video3.mp4'
+                and distracted_clips[0]['is_distracted'] == 1 and distracted_clips[0]['car_ratio'] == 0.8):
             print("✅ Distracted clips retrieved correctly")
         else:
             print("❌ Distracted clips retrieval failed")
@@ -161,6 +169,13 @@ def test_database():
             print("❌ Distraction analysis update failed")
             return False
 
+        classified_clips = db.get_classified_clips()
+        if {clip['filename'] for clip in classified_clips} == {'video1.mp4', 'video3.mp4'}:
+            print("✅ Classified clips retrieved correctly")
+        else:
+            print("❌ Classified clips retrieval failed")
+            return False
+
         # Test file processing check
         if db.is_file_processed('/path/to/test/video1.mp4'):
             print("✅ File processing check works correctly")
@@ -177,6 +192,56 @@ def test_database():
             print("❌ Unprocessed files detection failed")
             return False
 
+        # Test recorded_at is parsed from watcher clip filenames
+        motion_path = '/path/to/test/motion_20250626_124450_6s.mp4'
+        db.save_analysis_result(dict(test_analysis2, video_path=motion_path))
+        motion_clip = db.get_analysis_by_path(motion_path)
+        if motion_clip and motion_clip['recorded_at'] == '2025-06-26 12:44:50':
+            print("✅ Recording time extracted from filename correctly")
+        else:
+            print("❌ Recording time extraction failed")
+            return False
+
+        # Test reopening an up to date database skips the migrations
+        reopened = CarDetectionDB(test_db_path)
+        with reopened._connect() as conn:
+            schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version == SCHEMA_VERSION and reopened.get_statistics()['total_clips'] == 4:
+            print("✅ Schema version recorded and database reopened correctly")
+        else:
+            print("❌ Schema version check failed")
+            return False
+
+        # Test saving a batch of results in one transaction (all or nothing)
+        batch = [dict(test_analysis2, video_path=f'/path/to/test/batch{i}.mp4') for i in range(3)]
+        bad_batch = batch + [dict(test_analysis2, video_path='/path/to/test/bad.mp4', has_cars=None)]
+        if (not db.save_analysis_results(bad_batch) and db.get_statistics()['total_clips'] == 4
+                and db.save_analysis_results(batch) and db.get_statistics()['total_clips'] == 7):
+            print("✅ Batched results saved in a single transaction")
+        else:
+            print("❌ Batched result saving failed")
+            return False
+
+        # Test a clip replaced after its analysis is picked up again
+        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as clip_file:
+            clip_file.write(b'\0' * 2048)
+            clip_path = clip_file.name
+        try:
+            clip_stat = os.stat(clip_path)
+            db.save_analysis_result(dict(test_analysis2, video_path=clip_path,
+                                         file_size=clip_stat.st_size, file_mtime=clip_stat.st_mtime))
+            unchanged = db.get_unprocessed_files([clip_path])
+            with open(clip_path, 'ab') as clip_file:
+                clip_file.write(b'\0' * 1024)
+            changed = db.get_unprocessed_files([clip_path])
+        finally:
+            os.unlink(clip_path)
+        if unchanged == [] and changed == [clip_path]:
+            print("✅ Changed clips detected for reprocessing")
+        else:
+            print("❌ Changed clip detection failed")
+            return False
+
         print("\n🎉 All database tests passed!")
         return True
 
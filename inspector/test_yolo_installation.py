@@ -5,26 +5,35 @@ Test script to verify YOLOv8 installation and basic functionality
 
 import sys
 import os
+from functools import lru_cache
+
+try:
+    from ultralytics import YOLO
+    YOLO_IMPORT_ERROR = None
+except ImportError as e:
+    YOLO_IMPORT_ERROR = e
+
+
+@lru_cache(maxsize=1)
+def get_model():
+    """Load the YOLOv8n model once for the loading and detection tests"""
+    return YOLO('yolov8n.pt')
 
 def test_yolo_import():
     """Test if YOLOv8 can be imported"""
     print("Testing YOLOv8 import...")
-    try:
-        from ultralytics import YOLO
+    if YOLO_IMPORT_ERROR is None:
         print("✓ YOLOv8 import successful")
         return True
-    except ImportError as e:
-        print(f"✗ YOLOv8 import failed: {e}")
-        return False
+    print(f"✗ YOLOv8 import failed: {YOLO_IMPORT_ERROR}")
+    return False
 
 def test_yolo_model_loading():
     """Test if YOLOv8 model can be loaded"""
     print("\nTesting YOLOv8 model loading...")
     try:
-        from ultralytics import YOLO
-
         print("Loading YOLOv8n model (this may take a moment on first run)...")
-        model = YOLO('yolov8n.pt')
+        get_model()
         print("✓ YOLOv8n model loaded successfully")
         return True
     except Exception as e:
@@ -35,15 +44,13 @@ def test_basic_detection():
     """Test basic object detection"""
     print("\nTesting basic object detection...")
     try:
-        from ultralytics import YOLO
         import numpy as np
 
         # Create a simple test image (black image)
         test_image = np.zeros((480, 640, 3), dtype=np.uint8)
 
-        # Load model and run detection
-        model = YOLO('yolov8n.pt')
-        results = model(test_image, verbose=False)
+        # Run detection with the model loaded by the previous test
+        results = get_model()(test_image, verbose=False)
 
         print("✓ Basic detection test passed")
         return True
@@ -7,25 +7,106 @@ import cv2
 import os
 import sys
 import argparse
+import queue
+import threading
 from pathlib import Path
 import json
 import config
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-def view_clips_in_directory(directory: str, title: str):
+# Parsed analysis_results.json, reparsed only when the file changes
+_results_cache = {'mtime': None, 'data': None}
+
+
+def load_analysis_results(results_file: str) -> dict:
+    """
+    Load the analysis results summary, reusing the last parse while the file is unchanged
+
+    Args:
+        results_file: Path to analysis_results.json
+
+    Returns:
+        Parsed results dictionary
+    """
+    mtime = os.stat(results_file).st_mtime_ns
+    if mtime != _results_cache['mtime']:
+        with open(results_file, 'rb') as f:
+            content = f.read()
+        _results_cache['data'] = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+        _results_cache['mtime'] = mtime
+    return _results_cache['data']
+
+
+def iter_frames_prefetched(cap: cv2.VideoCapture, prefetch: int = config.PREFETCH_FRAMES, step: int = 1):
+    """
+    Yield the frames of an opened video while a background thread decodes ahead
+
+    Playback waits 1/fps between frames; decoding the next frames in the meantime
+    keeps the decode time out of that wait. The capture is released when the
+    video ends or the generator is closed.
+
+    Args:
+        cap: Opened video capture (owned by the reader thread from now on)
+        prefetch: Maximum number of decoded frames waiting to be shown
+        step: Yield every step-th frame; the ones in between are grabbed but
+            never converted to BGR
+    """
+    frames = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Wait for room in the queue, giving up once the consumer has stopped
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def reader():
+        try:
+            while True:
+                for _ in range(step - 1):
+                    cap.grab()
+                ret, frame = cap.read()
+                if not ret or not put(frame):
+                    break
+        finally:
+            cap.release()
+            put(None)  # End of video
+
+    threading.Thread(target=reader, daemon=True).start()
+    try:
+        while (frame := frames.get()) is not None:
+            yield frame
+    finally:
+        stop.set()
+
+
+def view_clips_in_directory(directory: str, title: str, prefetch: int = config.PREFETCH_FRAMES,
+                            max_fps: float = config.VIEWER_MAX_FPS):
     """
     View all video clips in a directory
 
     Args:
         directory: Directory containing video clips
         title: Title to display
+        prefetch: Frames decoded ahead of playback
+        max_fps: Highest frame rate shown; faster clips skip frames to keep real time
     """
     if not os.path.exists(directory):
         print(f"Directory {directory} does not exist!")
         return
 
-    video_files = [f for f in os.listdir(directory)
-                   if f.lower().endswith(('.mp4', '.avi', '.mov', '.mkv'))]
+    with os.scandir(directory) as entries:
+        video_files = sorted(entry.name for entry in entries
+                             if entry.is_file() and os.path.splitext(entry.name)[1].lower() in config.VIDEO_EXTENSIONS)
 
     if not video_files:
         print(f"No video files found in {directory}")
@@ -35,7 +116,7 @@ def view_clips_in_directory(directory: str, title: str):
     print("=" * len(title))
     print(f"Found {len(video_files)} video files")
 
-    for i, filename in enumerate(sorted(video_files)):
+    for i, filename in enumerate(video_files):
         filepath = os.path.join(directory, filename)
 
         print(f"\n{i+1}/{len(video_files)}: {filename}")
@@ -53,47 +134,47 @@ def view_clips_in_directory(directory: str, title: str):
 
         print(f"Duration: {duration:.1f}s, FPS: {fps:.1f}, Frames: {frame_count}")
 
-        # Play video
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        # Show every step-th frame for step/fps seconds each
+        step = max(1, round(fps / max_fps)) if fps > 0 else 1
+        delay = max(1, int(1000 * step / fps)) if fps > 0 else int(1000 / max_fps)
 
+        # Play video
+        frames = iter_frames_prefetched(cap, prefetch, step)
+        while (frame := next(frames, None)) is not None:
             # Display frame
             cv2.imshow(f"{title} - {filename}", frame)
 
             # Handle key presses
-            key = cv2.waitKey(int(1000/fps)) & 0xFF
+            key = cv2.waitKey(delay) & 0xFF
             if key == ord('q'):  # Quit
-                cap.release()
+                frames.close()
                 cv2.destroyAllWindows()
                 return
             elif key == ord('n'):  # Next video
                 break
             elif key == ord('p'):  # Previous video
-                cap.release()
+                frames.close()
                 cv2.destroyAllWindows()
                 if i > 0:
                     # Restart with previous video
-                    prev_filename = sorted(video_files)[i-1]
+                    prev_filename = video_files[i-1]
                     prev_filepath = os.path.join(directory, prev_filename)
                     cap = cv2.VideoCapture(prev_filepath)
                     if cap.isOpened():
                         print(f"Playing previous: {prev_filename}")
-                        while True:
-                            ret, frame = cap.read()
-                            if not ret:
-                                break
+                        for frame in iter_frames_prefetched(cap, prefetch, step):
                             cv2.imshow(f"{title} - {prev_filename}", frame)
-                            key = cv2.waitKey(int(1000/fps)) & 0xFF
+                            key = cv2.waitKey(delay) & 0xFF
                             if key in [ord('q'), ord('n'), ord('p')]:
                                 break
                 break
             elif key == ord('r'):  # Replay current video
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                # Start over with a fresh capture (the reader thread owns the old one)
+                frames.close()
+                frames = iter_frames_prefetched(cv2.VideoCapture(filepath), prefetch, step)
                 continue
 
-        cap.release()
+        frames.close()
         cv2.destroyAllWindows()
 
     print(f"\nFinished viewing all clips in {directory}")
@@ -101,6 +182,16 @@ def view_clips_in_directory(directory: str, title: str):
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='View organized car detection clips')
+    parser.add_argument('--prefetch', type=int, default=config.PREFETCH_FRAMES,
+                        help=f'Frames decoded ahead of playback (default: {config.PREFETCH_FRAMES})')
+    parser.add_argument('--max-fps', type=float, default=config.VIEWER_MAX_FPS,
+                        help=f'Highest frame rate shown, faster clips skip frames (default: {config.VIEWER_MAX_FPS})')
+    args = parser.parse_args()
+
+    # Playback is dominated by decoding and YUV->BGR conversion; keep OpenCV's SIMD/IPP paths on
+    cv2.setUseOptimized(True)
+
     organized_dir = f"{config.STORAGE_DIR}_organized"
 
     if not os.path.exists(organized_dir):
@@ -122,14 +213,13 @@ def main():
         choice = input("\nEnter your choice (1-4): ").strip()
 
         if choice == '1':
-            view_clips_in_directory(cars_dir, "Clips WITH Cars")
+            view_clips_in_directory(cars_dir, "Clips WITH Cars", args.prefetch, args.max_fps)
         elif choice == '2':
-            view_clips_in_directory(no_cars_dir, "Clips WITHOUT Cars")
+            view_clips_in_directory(no_cars_dir, "Clips WITHOUT Cars", args.prefetch, args.max_fps)
         elif choice == '3':
             results_file = os.path.join(organized_dir, "analysis_results.json")
             if os.path.exists(results_file):
-                with open(results_file, 'r') as f:
-                    results = json.load(f)
+                results = load_analysis_results(results_file)
 
                 print("\nAnalysis Results:")
                 print(f"Total clips: {results['total_clips']}")
@@ -11,6 +11,9 @@ import platform
 from database import CarDetectionDB
 import config
 
+# Columns view_clips_in_list shows; clip lists fetch only these instead of whole rows
+LIST_COLUMNS = ('filename', 'file_path', 'car_ratio', 'frames_analyzed', 'frames_with_cars', 'is_distracted')
+
 
 def get_video_player():
     """Get the appropriate video player command for the current platform"""
@@ -142,28 +145,31 @@ def main():
     print("6. View all clips")
     print("7. View database statistics")
     print("8. Exit")
+    print("0. Refresh clip lists")
+
+    # Clip lists per menu choice; each is fetched on first view and kept until refreshed
+    clip_menu = {
+        '1': (db.get_car_clips, "Clips WITH Cars"),
+        '2': (db.get_no_car_clips, "Clips WITHOUT Cars"),
+        '3': (db.get_distracted_clips, "Clips with DISTRACTED Drivers"),
+        '4': (db.get_not_distracted_clips, "Clips with NOT DISTRACTED Drivers"),
+        '5': (db.get_unanalyzed_distraction_clips, "Clips Needing Distraction Analysis"),
+        '6': (db.get_all_analyses, "All Clips"),
+    }
+    clip_lists = {}
 
     while True:
-        choice = input("\nEnter your choice (1-8): ").strip()
-
-        if choice == '1':
-            car_clips = db.get_car_clips()
-            view_clips_in_list(car_clips, "Clips WITH Cars")
-        elif choice == '2':
-            no_car_clips = db.get_no_car_clips()
-            view_clips_in_list(no_car_clips, "Clips WITHOUT Cars")
-        elif choice == '3':
-            distracted_clips = db.get_distracted_clips()
-            view_clips_in_list(distracted_clips, "Clips with DISTRACTED Drivers")
-        elif choice == '4':
-            not_distracted_clips = db.get_not_distracted_clips()
-            view_clips_in_list(not_distracted_clips, "Clips with NOT DISTRACTED Drivers")
-        elif choice == '5':
-            unanalyzed_clips = db.get_unanalyzed_distraction_clips()
-            view_clips_in_list(unanalyzed_clips, "Clips Needing Distraction Analysis")
-        elif choice == '6':
-            all_clips = db.get_all_analyses()
-            view_clips_in_list(all_clips, "All Clips")
+        choice = input("\nEnter your choice (0-8): ").strip()
+
+        if choice in clip_menu:
+            get_clips, title = clip_menu[choice]
+            if choice not in clip_lists:
+                clip_lists[choice] = get_clips(columns=LIST_COLUMNS)
+            view_clips_in_list(clip_lists[choice], title)
+        elif choice == '0':
+            clip_lists.clear()
+            stats = db.get_statistics()
+            print("Clip lists and statistics will be reloaded from the database")
         elif choice == '7':
             print("\nDatabase Statistics:")
             print("====================")
@@ -181,7 +187,7 @@ def main():
             print("Goodbye!")
             break
         else:
-            print("Please enter a valid choice (1-8)")
+            print("Please enter a valid choice (0-8)")
 
 
 if __name__ == "__main__":
@@ -8,12 +8,63 @@ import os
 import logging
 import signal
 import sys
+import itertools
+import hashlib
+import threading
 from typing import List, Tuple, Dict, Optional
 from pathlib import Path
 import config
 from ultralytics import YOLO
 from database import CarDetectionDB
 import subprocess
+import shutil
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    PYAV_AVAILABLE = False
+
+try:
+    import psutil  # Installed with ultralytics
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+# Ultralytics export name suffixes for formats that aren't named after the format itself
+EXPORT_SUFFIXES = {
+    'openvino': '_openvino_model',
+    'ncnn': '_ncnn_model',
+    'saved_model': '_saved_model',
+}
+
+# Export formats whose exported model is built for a fixed input shape unless
+# exported as dynamic; their batch dimension must cover a full inference batch
+DYNAMIC_EXPORT_FORMATS = ('onnx', 'engine', 'openvino')
+
+# Export formats whose Ultralytics backend only runs one image per call
+SINGLE_IMAGE_FORMATS = ('ncnn',)
+
+# Per-process detector used by the worker pool in process_all_clips
+_worker_detector = None
+
+
+def _init_worker(options: Dict, cv2_threads: int):
+    """Load a detector once in each worker process"""
+    global _worker_detector
+    # Let the main process handle Ctrl-C and drain the pool gracefully
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Split the cores between the workers instead of each starting one OpenCV thread per core
+    cv2.setNumThreads(cv2_threads)
+    _worker_detector = YOLOCarDetector(**options)
+
+
+def _analyze_clip_in_worker(video_path: str) -> Dict:
+    """Analyze a single clip in a worker process"""
+    return _worker_detector.analyze_video_clip(video_path)
 
 
 class YOLOCarDetector:
@@ -21,32 +72,85 @@ class YOLOCarDetector:
     Detects cars in video clips using YOLOv8
     """
 
-    def __init__(self, model_size: str = None, force: bool = False):
+    def __init__(self, model_size: str = None, force: bool = False, workers: int = None,
+                 batch_size: int = None, model_format: str = None, precision: str = None,
+                 decoder: str = None, screen_model_size: str = None,
+                 screen_band: Tuple[float, float] = None, cache_dir: str = None,
+                 hw_decode: bool = None, early_exit: bool = None):
         """
         Initialize YOLO car detector
 
         Args:
             model_size: Model size ('n'=nano, 's'=small, 'm'=medium, 'l'=large, 'x'=xlarge)
             force: If True, reprocess files even if they have already been analyzed
+            workers: Number of worker processes for process_all_clips (0 = one per CPU core)
+            batch_size: Sampled frames passed to YOLO per inference call (defaults to config.BATCH_SIZE)
+            model_format: Inference runtime, e.g. 'pt' or 'engine' (defaults to config.MODEL_FORMAT)
+            precision: 'fp32', 'fp16' or 'int8' (defaults to config.PRECISION)
+            decoder: Video decoder for sampled frames, 'opencv', 'pyav', 'ffmpeg' or 'nvdec'
+                (defaults to config.DECODER)
+            screen_model_size: Smaller model that screens frames first, so only frames it
+                is unsure about reach model_size (defaults to config.SCREEN_MODEL_SIZE)
+            screen_band: (low, high) screening confidences that count as unsure
+                (defaults to config.SCREEN_CONFIDENCE_BAND)
+            cache_dir: Directory for the sampled frames of each clip, so reruns skip
+                decoding (defaults to config.FRAME_CACHE_DIR, None = no cache)
+            hw_decode: Let the OpenCV decoder use a hardware decoder when one is
+                available (defaults to config.HW_DECODE)
+            early_exit: Stop analyzing a clip once it has min_car_frames frames with
+                cars; such results have car_ratio None (defaults to config.EARLY_EXIT)
         """
         # Setup logging
         self.logger = logging.getLogger(__name__)
 
-        # Initialize YOLO model
+        # Performance settings for Raspberry Pi
+        self.input_size = (640, 640)  # YOLO default input size
+        self.sample_rate = 3  # Process every 3rd frame for speed
+
+        # YOLO model settings (the model itself is loaded on first use)
         self.model_size = model_size or config.MODEL_SIZE
-        self.model = self._load_yolo_model()
+        self.model_format = model_format or config.MODEL_FORMAT
+        self.precision = precision or config.PRECISION
+        if self.precision == 'int8' and self.model_format == 'pt':
+            self.logger.warning("INT8 needs an exported MODEL_FORMAT (e.g. 'openvino'); running the PyTorch model at full precision")
 
         # Detection settings
         self.confidence_threshold = config.CONFIDENCE_THRESHOLD
         self.car_class_id = 2  # COCO dataset car class ID
         self.min_car_frames = 2  # Minimum frames with cars to consider video as containing cars
-
-        # Performance settings for Raspberry Pi
-        self.input_size = (640, 640)  # YOLO default input size
-        self.sample_rate = 3  # Process every 3rd frame for speed
+        self.early_exit = config.EARLY_EXIT if early_exit is None else early_exit
+        self.batch_size = config.BATCH_SIZE if batch_size is None else batch_size
+        self.decoder = decoder or config.DECODER
+        if self.decoder == 'pyav' and not PYAV_AVAILABLE:
+            self.logger.warning("PyAV is not installed (pip install av); decoding with OpenCV")
+            self.decoder = 'opencv'
+        elif self.decoder in ('ffmpeg', 'nvdec') and shutil.which('ffmpeg') is None:
+            self.logger.warning("ffmpeg not found on PATH; decoding with OpenCV")
+            self.decoder = 'opencv'
+
+        self.hw_decode = config.HW_DECODE if hw_decode is None else hw_decode
+
+        # Cascade: a small model screens every frame, the main model rechecks unsure ones
+        self.screen_model_size = screen_model_size or config.SCREEN_MODEL_SIZE
+        if self.screen_model_size == self.model_size:
+            self.screen_model_size = None
+        self.screen_band = screen_band or config.SCREEN_CONFIDENCE_BAND
+
+        # Sampled frame cache
+        self.cache_dir = cache_dir or config.FRAME_CACHE_DIR
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
 
         # Processing control
         self.force = force
+        self.workers = config.WORKERS if workers is None else workers
+        if self.workers == 0:
+            self.workers = os.cpu_count() or 1
+
+        # Make sure OpenCV's SIMD/IPP code paths (resize, color conversion) are enabled
+        cv2.setUseOptimized(True)
+        self.logger.debug(f"OpenCV {cv2.__version__}: optimized={cv2.useOptimized()}, "
+                          f"IPP={cv2.ipp.useIPP()}, threads={cv2.getNumThreads()}")
 
         # Initialize database
         self.db = CarDetectionDB(config.DATABASE_PATH)
@@ -55,15 +159,28 @@ class YOLOCarDetector:
         if self.force:
             self.logger.info("Force mode enabled - will reprocess files even if already analyzed")
 
-    def _load_yolo_model(self) -> YOLO:
+    @cached_property
+    def model(self) -> YOLO:
+        """YOLO model, loaded on first detection"""
+        return self._load_yolo_model(self.model_size)
+
+    @cached_property
+    def screen_model(self) -> YOLO:
+        """Smaller YOLO model for the screening pass, loaded on first detection"""
+        return self._load_yolo_model(self.screen_model_size)
+
+    def _load_yolo_model(self, model_size: str) -> YOLO:
         """Load YOLO model"""
         try:
-            model_name = f"yolov8{self.model_size}.pt"
+            model_name = f"yolov8{model_size}.pt"
             self.logger.info(f"Loading YOLO model: {model_name}")
 
             # This will automatically download the model if not present
             model = YOLO(model_name)
 
+            if self.model_format != 'pt':
+                model = self._load_exported_model(model, model_size)
+
             self.logger.info(f"YOLO model loaded successfully")
             return model
 
@@ -71,6 +188,39 @@ class YOLOCarDetector:
             self.logger.error(f"Failed to load YOLO model: {e}")
             raise
 
+    def _load_exported_model(self, model: YOLO, model_size: str) -> YOLO:
+        """
+        Load the model in self.model_format and self.precision, exporting it on first use
+
+        Args:
+            model: The loaded PyTorch model to export from
+            model_size: Size letter of the model, used in the export file name
+
+        Returns:
+            YOLO model backed by the exported runtime
+        """
+        # Keep Ultralytics' suffix so the runtime is still detected from the path,
+        # and tag the name with the precision so fp32/fp16/int8 exports don't collide
+        precision_tag = '' if self.precision == 'fp32' else f"_{self.precision}"
+        export_args = {}
+        if self.model_format in DYNAMIC_EXPORT_FORMATS:
+            # Dynamic shapes take the partial last batch of a clip; a TensorRT engine
+            # is built for up to its export batch size, so that goes in the name too
+            export_args = {'dynamic': True, 'batch': self.batch_size}
+            if self.model_format == 'engine':
+                precision_tag += f"_b{self.batch_size}"
+        export_path = f"yolov8{model_size}{precision_tag}{EXPORT_SUFFIXES.get(self.model_format, '.' + self.model_format)}"
+
+        if not os.path.exists(export_path):
+            self.logger.info(f"Exporting yolov8{model_size} to {self.model_format} ({self.precision}, one-time step)")
+            exported = model.export(format=self.model_format, imgsz=max(self.input_size),
+                                    half=self.precision == 'fp16', int8=self.precision == 'int8', **export_args)
+            if os.path.abspath(exported) != os.path.abspath(export_path):
+                shutil.move(exported, export_path)
+
+        self.logger.info(f"Loading exported model: {export_path}")
+        return YOLO(export_path, task='detect')
+
     def detect_cars_in_frame(self, frame: np.ndarray) -> List[Dict]:
         """
         Detect cars in a single frame using YOLOv8
@@ -81,57 +231,319 @@ class YOLOCarDetector:
         Returns:
             List of detection dictionaries with keys: bbox, confidence, class_id
         """
+        return self.detect_cars_in_frames([frame])[0]
+
+    def detect_cars_in_frames(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        """
+        Detect cars in several frames with a single batched YOLOv8 call
+
+        With a screening model configured, that model sees every frame and only
+        frames with a car confidence inside screen_band go through the main model.
+
+        Args:
+            frames: Input frames (BGR format)
+
+        Returns:
+            One list of detection dictionaries (bbox, confidence, class_id) per frame
+        """
         try:
-            # Run YOLO detection
-            results = self.model(frame, verbose=False)
-
-            car_detections = []
-
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Get detection info
-                        bbox = box.xyxy[0].cpu().numpy()  # x1, y1, x2, y2
-                        confidence = float(box.conf[0])
-                        class_id = int(box.cls[0])
-
-                        # Filter for cars with sufficient confidence
-                        if class_id == self.car_class_id and confidence >= self.confidence_threshold:
-                            x1, y1, x2, y2 = bbox
-                            detection = {
-                                'bbox': (int(x1), int(y1), int(x2-x1), int(y2-y1)),  # x, y, w, h
-                                'confidence': confidence,
-                                'class_id': class_id
-                            }
-                            car_detections.append(detection)
-
-            return car_detections
+            # Downscale large frames to the model input size up front; YOLO would
+            # otherwise resize the full-resolution frame itself on every call
+            scales = []
+            resized = []
+            for frame in frames:
+                frame, scale = self._downscale(frame)
+                scales.append(scale)
+                resized.append(frame)
+
+            if self.screen_model_size is None:
+                return self._run_detection(self.model, resized, scales, self.confidence_threshold)
+
+            # Screening pass: a frame is settled when every car is either clearly
+            # there (>= high) or clearly not (< low, so not returned at all)
+            low, high = self.screen_band
+            detections = self._run_detection(self.screen_model, resized, scales, low)
+            unsure = [i for i, frame_detections in enumerate(detections)
+                      if any(detection['confidence'] < high for detection in frame_detections)]
+
+            if unsure:
+                rechecked = self._run_detection(self.model, [resized[i] for i in unsure],
+                                                [scales[i] for i in unsure], self.confidence_threshold)
+                for i, frame_detections in zip(unsure, rechecked):
+                    detections[i] = frame_detections
+
+            return detections
 
         except Exception as e:
             self.logger.error(f"Error in car detection: {e}")
+            return [[] for _ in frames]
+
+    def _downscale(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Shrink a frame so its longer side fits the model input size
+
+        Args:
+            frame: Input frame (BGR format)
+
+        Returns:
+            Tuple of (frame, scale it was shrunk by, 1.0 if it already fit)
+        """
+        scale = min(1.0, max(self.input_size) / max(frame.shape[:2]))
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return frame, scale
+
+    def _run_detection(self, model: YOLO, frames: List[np.ndarray], scales: List[float],
+                       min_confidence: float) -> List[List[Dict]]:
+        """
+        Run one batched YOLO call and extract the car detections of every frame
+
+        Args:
+            model: YOLO model to run
+            frames: Frames already downscaled to the model input size
+            scales: Factor each frame was downscaled by
+            min_confidence: Lowest confidence kept
+
+        Returns:
+            One list of detection dictionaries per frame
+        """
+        # Let YOLO drop other classes and weak boxes during NMS, before any boxes
+        # are copied back from the device
+        predict_args = dict(imgsz=max(self.input_size), half=self.precision == 'fp16',
+                            conf=min_confidence, classes=[self.car_class_id], verbose=False)
+        if self.model_format in SINGLE_IMAGE_FORMATS:
+            results = [result for frame in frames for result in model(frame, **predict_args)]
+        else:
+            results = model(frames, **predict_args)
+        return [self._car_detections(result, scale, min_confidence) for result, scale in zip(results, scales)]
+
+    def _car_detections(self, result, scale: float, min_confidence: float) -> List[Dict]:
+        """
+        Extract car detections from one YOLO result
+
+        Args:
+            result: YOLO result for a single frame
+            scale: Factor the frame was downscaled by before inference
+            min_confidence: Lowest confidence kept
+
+        Returns:
+            List of detection dictionaries with keys: bbox, confidence, class_id
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
             return []
 
-    def analyze_video_clip(self, video_path: str, sample_frames: int = None) -> Dict:
+        # Copy each tensor off the device once per frame rather than once per box
+        xyxy = boxes.xyxy.cpu().numpy() / scale  # x1, y1, x2, y2 in original frame coordinates
+        confidences = boxes.conf.cpu().numpy()
+        class_ids = boxes.cls.cpu().numpy().astype(np.int32)
+
+        # Filter for cars with sufficient confidence
+        is_car = (class_ids == self.car_class_id) & (confidences >= min_confidence)
+
+        return [
+            {
+                'bbox': (int(x1), int(y1), int(x2 - x1), int(y2 - y1)),  # x, y, w, h
+                'confidence': float(confidence),
+                'class_id': self.car_class_id
+            }
+            for (x1, y1, x2, y2), confidence in zip(xyxy[is_car], confidences[is_car])
+        ]
+
+    @staticmethod
+    def _iter_sampled_frames(cap: cv2.VideoCapture, frame_indices: List[int]):
+        """
+        Yield the frames at frame_indices (ascending) in a single forward pass
+
+        Short gaps are skipped with grab(), which decodes without converting to
+        BGR; gaps of config.SEEK_MIN_GAP frames or more are skipped by seeking,
+        which only decodes forward from the nearest keyframe. retrieve() pays
+        for the BGR conversion only on sampled frames.
+        """
+        position = 0  # Index of the frame the next grab() decodes
+
+        for frame_idx in frame_indices:
+            if frame_idx - position >= config.SEEK_MIN_GAP:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                position = frame_idx
+
+            while position <= frame_idx:
+                if not cap.grab():
+                    return
+                position += 1
+
+            ret, frame = cap.retrieve()
+            if ret:
+                yield frame
+
+    @staticmethod
+    def _iter_sampled_frames_pyav(video_path: str, frame_indices: List[int]):
+        """
+        Yield the frames at frame_indices (ascending) decoded with PyAV
+
+        libavcodec decodes on its own threads (frame and slice threading) and
+        PyAV releases the GIL while it does, so decoding overlaps with inference
+        and with other clips. Every frame is decoded, so this suits the short
+        Watcher clips rather than long recordings where seeking pays off.
+        """
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = 'AUTO'
+
+            wanted = iter(frame_indices)
+            target = next(wanted, None)
+            for position, frame in enumerate(container.decode(stream)):
+                if target is None:
+                    return
+                if position == target:
+                    yield frame.to_ndarray(format='bgr24')
+                    target = next(wanted, None)
+
+    @staticmethod
+    def _iter_sampled_frames_ffmpeg(video_path: str, frame_indices: List[int], width: int, height: int,
+                                    hwaccel: Optional[str] = None):
+        """
+        Yield the frames at frame_indices (ascending) from an ffmpeg subprocess
+
+        ffmpeg's select filter drops every other frame right after decoding, so
+        only sampled frames are converted to BGR and piped back; decoding runs in
+        its own process, alongside inference instead of competing for the GIL.
+        With hwaccel='cuda' the decoding itself runs on the GPU's NVDEC engine.
+        """
+        select = '+'.join(f"eq(n,{frame_idx})" for frame_idx in frame_indices)
+        hwaccel_args = ['-hwaccel', hwaccel] if hwaccel else []
+        command = ['ffmpeg', '-v', 'error', *hwaccel_args, '-i', video_path,
+                   '-vf', f"select='{select}'", '-vsync', 'vfr',
+                   '-f', 'rawvideo', '-pix_fmt', 'bgr24', 'pipe:1']
+        frame_size = width * height * 3
+
+        with subprocess.Popen(command, stdout=subprocess.PIPE, bufsize=1 << 20) as process:
+            try:
+                while len(data := process.stdout.read(frame_size)) == frame_size:
+                    yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+            finally:
+                # Stop ffmpeg if the caller stops early
+                process.kill()
+
+    def _frame_cache_path(self, video_path: str, frame_indices: List[int]) -> str:
+        """
+        Cache file for the sampled frames of a clip
+
+        The name covers the clip's size and modification time, so a rewritten clip
+        gets a new entry, and the sampled indices and input size, so changing
+        SAMPLE_FRAMES does not reuse frames sampled for another setting.
+        """
+        stat = os.stat(video_path)
+        key = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}|{frame_indices}|{self.input_size}"
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(key.encode()).hexdigest()}.npy")
+
+    def _load_cached_frames(self, cache_path: str) -> Optional[np.ndarray]:
+        """
+        Memory-map the cached frames of a clip
+
+        Args:
+            cache_path: Path from _frame_cache_path
+
+        Returns:
+            Array of downscaled frames (N, H, W, 3), or None if not cached
+        """
+        try:
+            frames = np.load(cache_path, mmap_mode='r')
+            os.utime(cache_path)  # Mark as recently used for eviction
+            return frames
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable frame cache {cache_path}: {e}")
+            return None
+
+    def _iter_caching_frames(self, frames, cache_path: str):
+        """
+        Yield frames downscaled to the model input size and cache them once exhausted
+
+        Args:
+            frames: Iterator of sampled frames (BGR format)
+            cache_path: Path from _frame_cache_path
+        """
+        sampled = []
+        for frame in frames:
+            frame, _ = self._downscale(frame)
+            sampled.append(frame)
+            yield frame
+
+        if not sampled:
+            return
+        try:
+            # Write under a temporary name so a crash never leaves a truncated entry
+            temp_path = f"{cache_path}.{os.getpid()}.tmp.npy"
+            np.save(temp_path, np.stack(sampled))
+            os.replace(temp_path, cache_path)
+            self._evict_frame_cache()
+        except Exception as e:
+            self.logger.warning(f"Could not cache sampled frames to {cache_path}: {e}")
+
+    def _evict_frame_cache(self):
+        """Delete the least recently used cache entries above config.FRAME_CACHE_MAX_MB"""
+        with os.scandir(self.cache_dir) as it:
+            entries = [(stat.st_mtime, stat.st_size, entry.path) for entry in it
+                       if entry.is_file() and entry.name.endswith('.npy') and '.tmp.' not in entry.name
+                       for stat in (entry.stat(),)]
+
+        excess = sum(size for _, size, _ in entries) - config.FRAME_CACHE_MAX_MB * 1024 * 1024
+        for _, size, path in sorted(entries):
+            if excess <= 0:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Already evicted by another worker
+            excess -= size
+
+    def _open_capture(self, video_path: str) -> cv2.VideoCapture:
+        """
+        Open a clip, on a hardware decoder (VAAPI, NVDEC, V4L2 M2M, ...) if enabled
+
+        OpenCV picks whichever accelerator its FFmpeg build supports; if none
+        can open the clip it is reopened with the software decoder.
+        """
+        if self.hw_decode and self.decoder == 'opencv':
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG,
+                                   (cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+                                    cv2.CAP_PROP_HW_DEVICE, 0))
+            if cap.isOpened():
+                return cap
+            cap.release()
+            self.logger.debug(f"No hardware decoder for {video_path}; decoding in software")
+        return cv2.VideoCapture(video_path)
+
+    def analyze_video_clip(self, video_path: str, sample_frames: int = None,
+                           early_exit: bool = None) -> Dict:
         """
         Analyze a video clip to determine if it contains cars
 
         Args:
             video_path: Path to the video file
             sample_frames: Number of frames to sample for analysis
+            early_exit: Stop after the batch in which min_car_frames frames with cars
+                were found (defaults to self.early_exit). has_cars is unaffected, but
+                car_ratio is None since the remaining frames were never looked at;
+                pass False where the ratio is shown
 
         Returns:
             Dictionary with analysis results
         """
         if sample_frames is None:
             sample_frames = config.SAMPLE_FRAMES
+        if early_exit is None:
+            early_exit = self.early_exit
 
         if not os.path.exists(video_path):
             self.logger.error(f"Video file not found: {video_path}")
             return {"video_path": video_path, "error": "File not found"}
 
         # Check file size - if it's too small, it's likely corrupted
-        file_size = os.path.getsize(video_path)
+        file_stat = os.stat(video_path)
+        file_size = file_stat.st_size
         if file_size < 1024:  # Less than 1KB
             self.logger.error(f"Video file too small (likely corrupted): {video_path} ({file_size} bytes)")
             return {"video_path": video_path, "error": "File too small (corrupted)"}
@@ -147,7 +559,7 @@ class YOLOCarDetector:
             # If ffprobe is not available or times out, continue with OpenCV
             self.logger.warning(f"ffprobe not available or timed out for {video_path}, continuing with OpenCV")
 
-        cap = cv2.VideoCapture(video_path)
+        cap = self._open_capture(video_path)
         if not cap.isOpened():
             self.logger.error(f"Could not open video: {video_path}")
             return {"video_path": video_path, "error": "Could not open video"}
@@ -161,32 +573,58 @@ class YOLOCarDetector:
             if total_frames <= sample_frames:
                 frame_indices = list(range(total_frames))
             else:
-                # Sample frames evenly throughout the video
-                step = max(1, total_frames // sample_frames)
-                frame_indices = list(range(0, total_frames, step))[:sample_frames]
-
-            car_detections = []
-            frames_with_cars = 0
-            processed_frames = 0
-
-            for frame_idx in frame_indices:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
-
-                if not ret:
-                    continue
-
-                processed_frames += 1
-
-                # Detect cars in this frame
-                detections = self.detect_cars_in_frame(frame)
-
-                if detections:
-                    frames_with_cars += 1
-                    car_detections.extend(detections)
+                # Sample frames evenly throughout the video, first to last
+                frame_indices = np.linspace(0, total_frames - 1, sample_frames, dtype=int).tolist()
+
+            cars_per_frame = []  # Number of cars detected in each analyzed frame
+            exited_early = False
+            cache_path = self._frame_cache_path(video_path, frame_indices) if self.cache_dir else None
+            cached_frames = self._load_cached_frames(cache_path) if cache_path else None
+            if cached_frames is not None:
+                frames = iter(cached_frames)
+            elif self.decoder == 'pyav':
+                frames = self._iter_sampled_frames_pyav(video_path, frame_indices)
+            elif self.decoder in ('ffmpeg', 'nvdec'):
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                hwaccel = 'cuda' if self.decoder == 'nvdec' else None
+                frames = self._iter_sampled_frames_ffmpeg(video_path, frame_indices, width, height, hwaccel)
+            else:
+                frames = self._iter_sampled_frames(cap, frame_indices)
+            if cache_path and cached_frames is None:
+                frames = self._iter_caching_frames(frames, cache_path)
+
+            def next_batch():
+                return list(itertools.islice(frames, self.batch_size))
+
+            # Decode the next batch of samples on a helper thread while the current
+            # one is being detected; both steps release the GIL
+            with ThreadPoolExecutor(max_workers=1) as decoder:
+                pending_batch = decoder.submit(next_batch)
+                while True:
+                    batch = pending_batch.result()
+                    if not batch:
+                        break
+                    pending_batch = decoder.submit(next_batch)
+
+                    # Detect cars in the whole batch with one inference call
+                    cars_per_frame.extend(map(len, self.detect_cars_in_frames(batch)))
+
+                    if early_exit and np.count_nonzero(cars_per_frame) >= self.min_car_frames:
+                        exited_early = True
+                        break
+
+            # Reduce the per-frame counts in one go
+            cars_per_frame = np.array(cars_per_frame, dtype=np.int32)
+            processed_frames = int(cars_per_frame.size)
+            frames_with_cars = int(np.count_nonzero(cars_per_frame))
+            total_car_detections = int(cars_per_frame.sum())
 
             # Determine if video contains cars
-            car_ratio = frames_with_cars / processed_frames if processed_frames > 0 else 0
+            if exited_early:
+                car_ratio = None
+            else:
+                car_ratio = frames_with_cars / processed_frames if processed_frames > 0 else 0
             has_cars = frames_with_cars >= self.min_car_frames
 
             result = {
@@ -197,20 +635,26 @@ class YOLOCarDetector:
                 "frames_with_cars": frames_with_cars,
                 "car_ratio": car_ratio,
                 "has_cars": has_cars,
-                "total_car_detections": len(car_detections),
-                "average_cars_per_frame": len(car_detections) / processed_frames if processed_frames > 0 else 0,
+                "total_car_detections": total_car_detections,
+                "average_cars_per_frame": total_car_detections / processed_frames if processed_frames > 0 else 0,
                 "detection_method": f"yolov8{self.model_size}",
                 "confidence_threshold": self.confidence_threshold,
-                "min_car_frames": self.min_car_frames
+                "min_car_frames": self.min_car_frames,
+                # Stored so later runs can tell when the clip was replaced
+                "file_size": file_size,
+                "file_mtime": file_stat.st_mtime
             }
 
-            self.logger.info(f"Analysis complete for {video_path}: has_cars={has_cars}, car_ratio={car_ratio:.2f}")
+            ratio_text = "n/a (early exit)" if car_ratio is None else f"{car_ratio:.2f}"
+            self.logger.info(f"Analysis complete for {video_path}: has_cars={has_cars}, car_ratio={ratio_text}")
             return result
 
         finally:
             cap.release()
 
-    def process_all_clips(self, input_dir: str = None, output_dir: str = None) -> Dict:
+    def process_all_clips(self, input_dir: str = None, output_dir: str = None,
+                          files: Optional[List[str]] = None,
+                          cancel_event: Optional[threading.Event] = None) -> Dict:
         """
         Process all video clips in the input directory and organize them by car detection results.
         This method is idempotent - files already processed will be skipped.
@@ -219,42 +663,48 @@ class YOLOCarDetector:
         Args:
             input_dir: Directory containing video clips (defaults to config.STORAGE_DIR)
             output_dir: Directory to organize results (defaults to input_dir + "_organized")
+            files: Video filenames in input_dir, if the caller has already listed it
+            cancel_event: Event that stops processing at the next clip once set, e.g. by
+                the caller's own signal handler before this method was entered
 
         Returns:
             Dictionary with processing results
         """
-        # Setup graceful shutdown
-        self.shutdown_requested = False
+        # Setup graceful shutdown: the handler only sets a flag, the loop below
+        # stops between clips and the pending results are still saved
+        self.shutdown_event = cancel_event if cancel_event is not None else threading.Event()
 
         def signal_handler(signum, frame):
             self.logger.info("Shutdown signal received. Saving progress and shutting down gracefully...")
-            self.shutdown_requested = True
+            self.shutdown_event.set()
 
         # Register signal handlers
         original_sigint = signal.signal(signal.SIGINT, signal_handler)
         original_sigterm = signal.signal(signal.SIGTERM, signal_handler)
 
         try:
-            return self._process_all_clips_internal(input_dir, output_dir)
+            return self._process_all_clips_internal(input_dir, output_dir, files)
         finally:
             # Restore original signal handlers
             signal.signal(signal.SIGINT, original_sigint)
             signal.signal(signal.SIGTERM, original_sigterm)
 
-    def _process_all_clips_internal(self, input_dir: str = None, output_dir: str = None) -> Dict:
+    def _process_all_clips_internal(self, input_dir: str = None, output_dir: str = None,
+                                    files: Optional[List[str]] = None) -> Dict:
         """
         Internal implementation of process_all_clips with database storage
         """
         if input_dir is None:
             input_dir = config.STORAGE_DIR
 
-        # Find all video files in input directory
-        video_extensions = ['.mp4', '.avi', '.mov', '.mkv']
-        input_video_files = []
-
-        for file in os.listdir(input_dir):
-            if any(file.lower().endswith(ext) for ext in video_extensions):
-                input_video_files.append(os.path.join(input_dir, file))
+        if files is not None:
+            input_video_files = [os.path.join(input_dir, filename) for filename in files]
+        else:
+            # Find all video files in input directory (scandir entries come with their joined path)
+            with os.scandir(input_dir) as it:
+                input_video_files = [entry.path for entry in it
+                                     if entry.is_file()
+                                     and os.path.splitext(entry.name)[1].lower() in config.VIDEO_EXTENSIONS]
 
         if not input_video_files:
             self.logger.info("No video files found in input directory")
@@ -297,36 +747,77 @@ class YOLOCarDetector:
         errors = 0
         interrupted = False
 
-        for i, video_path in enumerate(files_to_process):
-            # Check for shutdown request
-            if self.shutdown_requested:
-                self.logger.info(f"Processing interrupted at file {i+1}/{len(files_to_process)}: {os.path.basename(video_path)}")
-                interrupted = True
-                break
-
-            self.logger.info(f"Processing {i+1}/{len(files_to_process)}: {os.path.basename(video_path)}")
-
-            try:
-                analysis = self.analyze_video_clip(video_path)
+        # With several workers every clip is queued up front and results are
+        # consumed in order; each worker loads its own copy of the model, so
+        # this process never needs one
+        executor = None
+        futures = {}
+        pending_results = []
+        workers = self._affordable_workers() if self.workers > 1 else self.workers
+        if workers > 1 and len(files_to_process) > 1:
+            self.logger.info(f"Analyzing clips with {workers} worker processes")
+            if self.model_format != 'pt':
+                # Export here once so the workers don't race to write the same file
+                self.model
+                if self.screen_model_size is not None:
+                    self.screen_model
+            worker_options = {
+                'model_size': self.model_size,
+                'batch_size': self.batch_size,
+                'model_format': self.model_format,
+                'precision': self.precision,
+                'decoder': self.decoder,
+                'screen_model_size': self.screen_model_size,
+                'screen_band': self.screen_band,
+                'cache_dir': self.cache_dir,
+                'hw_decode': self.hw_decode,
+                'early_exit': self.early_exit,
+            }
+            cv2_threads = max(1, (os.cpu_count() or 1) // workers)
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(worker_options, cv2_threads))
+            futures = {path: executor.submit(_analyze_clip_in_worker, path) for path in files_to_process}
 
-                if "error" in analysis:
-                    errors += 1
-                    self.logger.error(f"Error processing {video_path}: {analysis['error']}")
-                    # Save error result to database
-                    self.db.save_analysis_result(analysis)
-                    continue
-
-                # Save analysis result to database
-                if self.db.save_analysis_result(analysis):
-                    newly_processed += 1
-                    self.logger.info(f"Analysis complete for {os.path.basename(video_path)}: has_cars={analysis['has_cars']}")
-                else:
+        try:
+            for i, video_path in enumerate(files_to_process):
+                # Check for shutdown request
+                if self.shutdown_event.is_set():
+                    self.logger.info(f"Processing interrupted at file {i+1}/{len(files_to_process)}: {os.path.basename(video_path)}")
+                    interrupted = True
+                    break
+
+                self.logger.info(f"Processing {i+1}/{len(files_to_process)}: {os.path.basename(video_path)}")
+
+                try:
+                    if executor is not None:
+                        analysis = futures[video_path].result()
+                    else:
+                        analysis = self.analyze_video_clip(video_path)
+
+                    if "error" in analysis:
+                        errors += 1
+                        self.logger.error(f"Error processing {video_path}: {analysis['error']}")
+                    else:
+                        self.logger.info(f"Analysis complete for {os.path.basename(video_path)}: has_cars={analysis['has_cars']}")
+
+                    # Results (including errors) are written in batches, one transaction each
+                    pending_results.append(analysis)
+                    if len(pending_results) >= config.DB_BATCH_SIZE:
+                        saved, failed = self._save_results(pending_results)
+                        newly_processed += saved
+                        errors += failed
+
+                except Exception as e:
                     errors += 1
-                    self.logger.error(f"Failed to save analysis result for {video_path}")
-
-            except Exception as e:
-                errors += 1
-                self.logger.error(f"Exception processing {video_path}: {e}")
+                    self.logger.error(f"Exception processing {video_path}: {e}")
+        finally:
+            if executor is not None:
+                # Drop queued clips; clips already being analyzed finish first
+                executor.shutdown(wait=True, cancel_futures=True)
+            # Save whatever is left, also when interrupted
+            saved, failed = self._save_results(pending_results)
+            newly_processed += saved
+            errors += failed
 
         # Get final statistics
         stats = self.db.get_statistics()
@@ -353,6 +844,49 @@ class YOLOCarDetector:
 
         return results
 
+    def _affordable_workers(self) -> int:
+        """
+        Cap self.workers to the worker processes that fit in the available memory
+
+        Each worker loads its own model, so too many workers on a small machine
+        end up swapping instead of running in parallel.
+
+        Returns:
+            Number of workers to start (at least 1)
+        """
+        if not PSUTIL_AVAILABLE:
+            return self.workers
+
+        available_mb = psutil.virtual_memory().available // (1024 * 1024)
+        affordable = max(1, available_mb // config.WORKER_MEMORY_MB)
+        if affordable < self.workers:
+            self.logger.warning(f"Only {available_mb} MB of memory available; using {affordable} "
+                                f"of {self.workers} workers ({config.WORKER_MEMORY_MB} MB each)")
+            return affordable
+        return self.workers
+
+    def _save_results(self, results: List[Dict]) -> Tuple[int, int]:
+        """
+        Save a batch of analysis results and empty the list
+
+        Args:
+            results: Pending analysis results (cleared in place)
+
+        Returns:
+            Tuple of (newly processed clips saved, clips that failed to save)
+        """
+        if not results:
+            return 0, 0
+
+        successful = sum(1 for result in results if "error" not in result)
+        if self.db.save_analysis_results(results):
+            results.clear()
+            return successful, 0
+
+        self.logger.error(f"Failed to save {len(results)} analysis results")
+        results.clear()
+        return 0, successful
+
     def create_summary_report(self, results: Dict) -> str:
         """
         Create a human-readable summary report
@@ -29,7 +29,13 @@ def main():
 
     input_dir = config.STORAGE_DIR
     video_extensions = ('.mp4', '.avi', '.mov', '.mkv')
-    video_files = [f for f in os.listdir(input_dir) if f.lower().endswith(video_extensions)]
+    # scandir gives names, paths and file types from the directory read itself;
+    # empty files (e.g. interrupted transfers) are skipped up front
+    with os.scandir(input_dir) as it:
+        video_files = sorted((entry for entry in it
+                              if entry.is_file() and entry.name.lower().endswith(video_extensions)
+                              and entry.stat().st_size > 0),
+                             key=lambda entry: entry.name)
 
     if not video_files:
         print(f"No video files found in {input_dir}")
@@ -47,11 +53,12 @@ def main():
     print(f"{'Clip Name':40} | {'Has Car':7} | {'Car Ratio':8} | {'Frames':6} | {'Method':8}")
     print("-" * 80)
 
-    for i, filename in enumerate(sorted(video_files)):
-        path = os.path.join(input_dir, filename)
+    for i, entry in enumerate(video_files):
+        filename = entry.name
         print(f"Processing {i+1}/{len(video_files)}: {filename}")
 
-        analysis = detector.analyze_video_clip(path, sample_frames=config.SAMPLE_FRAMES)
+        analysis = detector.analyze_video_clip(entry.path, sample_frames=config.SAMPLE_FRAMES,
+                                               early_exit=False)
 
         if "error" in analysis:
             has_car = False
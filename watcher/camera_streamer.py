@@ -9,7 +9,7 @@ Run with: python3 camera_streamer.py
 
 import time
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import io
 import config
 import numpy as np
@@ -23,40 +23,116 @@ except ImportError:
     print("Picamera2 is not installed. Install it with: sudo apt install python3-picamera2")
     exit(1)
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
+try:
+    from picamera2.encoders import MJPEGEncoder, Quality
+    from picamera2.outputs import FileOutput
+    MJPEG_ENCODER_AVAILABLE = True
+except ImportError:
+    MJPEG_ENCODER_AVAILABLE = False
+
+
+class StreamingOutput(io.BufferedIOBase):
+    """
+    Holds the latest JPEG frame written by Picamera2's MJPEG encoder
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.frame_seq = 0
+        self.condition = threading.Condition()
+
+    def write(self, buf):
+        with self.condition:
+            self.frame = buf
+            self.frame_seq += 1
+            self.condition.notify_all()
+
+
 class CameraStreamer:
     """
     Streams camera feed over HTTP for remote viewing (using Picamera2)
     Optimized for lens calibration with higher resolution and faster refresh
     """
 
-    def __init__(self, port: int = 8080):
+    def __init__(self, port: int = 8080, use_hardware_encoder: bool = True):
         self.port = port
         self.is_running = False
         self.current_frame = None
+        self._frame_seq = 0  # Bumped on every new frame so readers can skip duplicates
         self.frame_lock = threading.Lock()
         self.server = None
         self.picam = None
 
+        # Let Picamera2 produce the JPEGs itself when its MJPEG encoder is available
+        self.use_hardware_encoder = use_hardware_encoder and MJPEG_ENCODER_AVAILABLE
+        self.output = None
+
         # Calibration-optimized settings
         self.calibration_width = 1920  # Higher resolution for calibration
         self.calibration_height = 1080
         self.calibration_fps = 30  # Higher FPS for responsiveness
         self.stream_quality = 90  # Higher JPEG quality for calibration
 
+        # libjpeg-turbo encoder (falls back to cv2.imencode if not installed)
+        self._tj = TurboJPEG() if TURBOJPEG_AVAILABLE else None
+
+    def encode_frame(self, frame: np.ndarray) -> bytes:
+        """Encode a captured frame as JPEG"""
+        if self._tj is not None:
+            # Picamera2's RGB888 is laid out B, G, R in memory, so no channel swap is needed
+            return self._tj.encode(frame, quality=self.stream_quality, pixel_format=TJPF_BGR)
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.stream_quality])
+        return buffer.tobytes()
+
     def start(self):
         """Start the camera streamer"""
         print(f"Starting Camera Streamer on port {self.port}...")
         print(f"Open your web browser and go to: http://raspberrypi-ddd.local:{self.port}")
         print(f"Calibration Mode: {self.calibration_width}x{self.calibration_height} @ {self.calibration_fps}fps")
+        if self.use_hardware_encoder:
+            print("JPEG encoder: Picamera2 MJPEGEncoder")
+        else:
+            print(f"JPEG encoder: {'TurboJPEG' if self._tj is not None else 'OpenCV'}")
+            if self._tj is None:
+                self._check_opencv_jpeg()
         print("Press Ctrl+C to stop")
         print()
 
         # Initialize Picamera2 with calibration settings
         self.picam = Picamera2()
+        if self.use_hardware_encoder:
+            self._start_hardware_encoder()
+        else:
+            self._start_capture_loop()
+
+        # Start HTTP server
+        self._start_http_server()
+
+    def _start_hardware_encoder(self):
+        """Stream JPEGs straight from Picamera2's MJPEG encoder"""
+        config_dict = self.picam.create_video_configuration(
+            main={"size": (self.calibration_width, self.calibration_height)},
+            controls={"FrameRate": self.calibration_fps}
+        )
+        self.picam.configure(config_dict)
+        self.output = StreamingOutput()
+        self.picam.start_recording(MJPEGEncoder(), FileOutput(self.output), quality=Quality.VERY_HIGH)
+        time.sleep(1)  # Reduced warm-up time
+        self.picam.set_controls({"AwbMode": 6})
+        self.is_running = True
+
+    def _start_capture_loop(self):
+        """Capture raw frames and encode them in Python"""
         config_dict = self.picam.create_preview_configuration(
             main={
                 "size": (self.calibration_width, self.calibration_height),
-                "format": "RGB888"
+                "format": "RGB888"  # B, G, R byte order, as OpenCV expects
             },
             buffer_count=4  # More buffers for smoother streaming
         )
@@ -71,13 +147,51 @@ class CameraStreamer:
         camera_thread.daemon = True
         camera_thread.start()
 
-        # Start HTTP server
-        self._start_http_server()
+    def get_jpeg(self, last_seq: int) -> Tuple[Optional[bytes], int]:
+        """
+        Get the latest JPEG frame if it is newer than last_seq
+
+        Args:
+            last_seq: Sequence number of the last frame the caller sent
+
+        Returns:
+            Tuple of (JPEG bytes or None if there is no new frame, sequence number)
+        """
+        if self.output is not None:
+            with self.output.condition:
+                self.output.condition.wait_for(
+                    lambda: self.output.frame_seq != last_seq or not self.is_running, timeout=1.0)
+                if self.output.frame is None or self.output.frame_seq == last_seq:
+                    return None, last_seq
+                return self.output.frame, self.output.frame_seq
+
+        # Only hold the lock long enough to grab the frame reference
+        with self.frame_lock:
+            frame = self.current_frame
+            seq = self._frame_seq
+
+        if frame is None or seq == last_seq:
+            return None, last_seq
+        return self.encode_frame(frame), seq
+
+    def _check_opencv_jpeg(self):
+        """Warn if OpenCV's JPEG codec is not built against libjpeg-turbo"""
+        jpeg_lines = [line.strip() for line in cv2.getBuildInformation().splitlines()
+                      if line.strip().startswith('JPEG:')]
+        jpeg_info = jpeg_lines[0] if jpeg_lines else "JPEG: unknown"
+        print(f"OpenCV {jpeg_info}")
+        if 'turbo' not in jpeg_info.lower():
+            print("[WARNING] OpenCV is not using libjpeg-turbo, JPEG encoding will be slower")
 
     def stop(self):
         """Stop the camera streamer"""
         self.is_running = False
+        if self.output is not None:
+            with self.output.condition:
+                self.output.condition.notify_all()
         if self.picam:
+            if self.output is not None:
+                self.picam.stop_recording()
             self.picam.close()
         if self.server:
             self.server.shutdown()
@@ -88,9 +202,11 @@ class CameraStreamer:
         while self.is_running:
             try:
                 if self.picam is not None:
+                    # capture_array() returns a fresh array, so publish it without copying
                     frame = self.picam.capture_array()
                     with self.frame_lock:
-                        self.current_frame = frame.copy()
+                        self.current_frame = frame
+                        self._frame_seq += 1
                 else:
                     print("[WARNING] Camera not initialized")
                     time.sleep(0.1)
@@ -103,7 +219,8 @@ class CameraStreamer:
     def _start_http_server(self):
         """Start HTTP server for streaming"""
         handler = self._create_handler()
-        self.server = HTTPServer(('0.0.0.0', self.port), handler)
+        # Threaded so each long-lived MJPEG viewer gets its own connection
+        self.server = ThreadingHTTPServer(('0.0.0.0', self.port), handler)
         print(f"Server started at http://0.0.0.0:{self.port}")
         self.server.serve_forever()
 
@@ -111,115 +228,88 @@ class CameraStreamer:
         """Create HTTP request handler"""
         streamer = self
 
+        # The page only depends on fixed streamer settings, so build it once
+        html_bytes = ("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Camera Stream - Calibration Mode</title>
+            <style>
+                body { margin: 0; padding: 20px; background: #000; }
+                .container { text-align: center; }
+                img { max-width: 60vw; width: 100%; height: auto; border: 2px solid #333; margin: 0 auto; display: block; }
+                .info { color: white; margin: 10px 0; font-family: Arial, sans-serif; }
+                .controls {
+                    display: flex;
+                    align-items: center;
+                    gap: 20px;
+                    margin: 20px 0;
+                    flex-wrap: wrap;
+                }
+                button { margin: 5px; padding: 10px 20px; font-size: 16px; background: #007bff; color: white; border: none; border-radius: 5px; cursor: pointer; }
+                button:hover { background: #0056b3; }
+                .calibration-info { background: #333; padding: 15px; border-radius: 10px; margin: 20px 0; }
+                .refresh-rate { color: #00ff00; font-weight: bold; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="info">
+                    <h2>Camera Stream - Calibration Mode</h2>
+                    <div class="calibration-info">
+                        <p>Resolution: """ + f"{streamer.calibration_width}x{streamer.calibration_height}" + """ | FPS: """ + str(streamer.calibration_fps) + """</p>
+                        <p class="refresh-rate">Live MJPEG stream</p>
+                        <p>JPEG Quality: """ + str(streamer.stream_quality) + """%</p>
+                    </div>
+                </div>
+                <img id="stream" src="/stream" alt="Camera Stream">
+                <div class="controls">
+                    <button onclick="location.reload()">Refresh Page</button>
+                    <button onclick="document.getElementById('stream').src='/stream?' + new Date().getTime()">Reload Stream</button>
+                </div>
+            </div>
+        </body>
+        </html>
+        """).encode()
+
         class StreamHandler(BaseHTTPRequestHandler):
             def do_GET(self):
                 if self.path == '/':
                     self.send_response(200)
                     self.send_header('Content-type', 'text/html')
+                    self.send_header('Content-length', str(len(html_bytes)))
                     self.end_headers()
 
-                    html = """
-                    <!DOCTYPE html>
-                    <html>
-                    <head>
-                        <title>Camera Stream - Calibration Mode</title>
-                        <style>
-                            body { margin: 0; padding: 20px; background: #000; }
-                            .container { text-align: center; }
-                            img { max-width: 60vw; width: 100%; height: auto; border: 2px solid #333; margin: 0 auto; display: block; }
-                            .info { color: white; margin: 10px 0; font-family: Arial, sans-serif; }
-                            .controls {
-                                display: flex;
-                                align-items: center;
-                                gap: 20px;
-                                margin: 20px 0;
-                                flex-wrap: wrap;
-                            }
-                            .button-group {
-                                display: contents;
-                            }
-                            .checkbox-container {
-                                display: flex; align-items: center; margin: 0;
-                            }
-                            button { margin: 5px; padding: 10px 20px; font-size: 16px; background: #007bff; color: white; border: none; border-radius: 5px; cursor: pointer; }
-                            button:hover { background: #0056b3; }
-                            .calibration-info { background: #333; padding: 15px; border-radius: 10px; margin: 20px 0; }
-                            .refresh-rate { color: #00ff00; font-weight: bold; }
-                            .refresh-rate.disabled { text-decoration: line-through; color: #888; }
-                            .checkbox-container input[type=\"checkbox\"] { opacity: 0; width: 0; height: 0; position: absolute; }
-                            .checkbox-container label {
-                                display: inline-flex;
-                                align-items: center;
-                                cursor: pointer;
-                                font-size: 16px;
-                                color: white;
-                                user-select: none;
-                                position: relative;
-                                padding-left: 32px;
-                                margin-bottom: 0;
-                            }
-                            .checkbox-container .checkmark {
-                                position: absolute;
-                                left: 0;
-                                top: 50%;
-                                transform: translateY(-50%);
-                                height: 22px;
-                                width: 22px;
-                                background-color: #222;
-                                border: 2px solid #007bff;
-                                border-radius: 4px;
-                                transition: background 0.2s, border 0.2s;
-                            }
-                            .checkbox-container label:hover .checkmark {
-                                border-color: #0056b3;
-                                background: #333;
-                            }
-                            .checkbox-container input[type=\"checkbox\"]:checked + label .checkmark {
-                                background-color: #007bff;
-                                border-color: #007bff;
-                            }
-                            .checkbox-container .checkmark:after {
-                                content: "";
-                                position: absolute;
-                                display: none;
-                                left: 6px;
-                                top: 2px;
-                                width: 6px;
-                                height: 12px;
-                                border: solid white;
-                                border-width: 0 3px 3px 0;
-                                transform: rotate(45deg);
-                            }
-                            .checkbox-container input[type=\"checkbox\"]:checked + label .checkmark:after {
-                                display: block;
-                            }
-                        </style>
-                    </head>
-                    <body>
-                        <div class=\"container\">\n                            <div class=\"info\">\n                                <h2>Camera Stream - Calibration Mode</h2>\n                                <div class=\"calibration-info\">\n                                    <p>Resolution: """ + f"{streamer.calibration_width}x{streamer.calibration_height}" + """ | FPS: """ + str(streamer.calibration_fps) + """</p>\n                                    <p class=\"refresh-rate\" id=\"refreshRate\">Auto-refresh: Every 1 second</p>\n                                    <p>JPEG Quality: """ + str(streamer.stream_quality) + """%</p>\n                                </div>\n                            </div>\n                            <img id=\"stream\" src=\"/stream\" alt=\"Camera Stream\">\n                            <div class=\"controls\">\n                                <div class=\"checkbox-container\">\n                                    <input type=\"checkbox\" id=\"autoRefreshCheckbox\" checked>\n                                    <label for=\"autoRefreshCheckbox\">Auto-refresh stream<span class=\"checkmark\"></span></label>\n                                </div>\n                                <button onclick=\"location.reload()\">Refresh Page</button>\n                                <button onclick=\"document.getElementById('stream').src='/stream?' + new Date().getTime()\">Reload Stream</button>\n                            </div>\n                        </div>\n                        <script>\n                            let autoRefreshEnabled = true;\n                            let refreshInterval;\n                            \n                            function handleAutoRefreshChange() {\n                                const checkbox = document.getElementById('autoRefreshCheckbox');\n                                autoRefreshEnabled = checkbox.checked;\n                                \n                                if (autoRefreshEnabled) {\n                                    startAutoRefresh();\n                                    document.getElementById('refreshRate').classList.remove('disabled');\n                                    console.log('Auto-refresh enabled');\n                                } else {\n                                    clearInterval(refreshInterval);\n                                    document.getElementById('refreshRate').classList.add('disabled');\n                                    console.log('Auto-refresh disabled');\n                                }\n                            }\n                            \n                            function startAutoRefresh() {\n                                refreshInterval = setInterval(function() {\n                                    if (autoRefreshEnabled) {\n                                        document.getElementById('stream').src = '/stream?' + new Date().getTime();\n                                    }\n                                }, 1000); // Refresh every 1 second for calibration\n                            }\n                            \n                            // Start auto-refresh immediately\n                            startAutoRefresh();\n                            \n                            // Add event listener to checkbox\n                            document.addEventListener('DOMContentLoaded', function() {\n                                document.getElementById('autoRefreshCheckbox').addEventListener('change', handleAutoRefreshChange);\n                            });\n                            \n                            // Also refresh on page load\n                            window.onload = function() {\n                                document.getElementById('stream').src = '/stream?' + new Date().getTime();\n                            };\n                        </script>\n                    </body>\n                    </html>\n                    """
-                    self.wfile.write(html.encode())
+                    self.wfile.write(html_bytes)
 
                 elif self.path.startswith('/stream'):
-                    print("[DEBUG] /stream endpoint hit")
-                    with streamer.frame_lock:
-                        if streamer.current_frame is not None:
-                            print("[DEBUG] Frame available, sending JPEG")
-                            # Encode as JPEG with higher quality for calibration
-                            _, buffer = cv2.imencode('.jpg', streamer.current_frame, [cv2.IMWRITE_JPEG_QUALITY, streamer.stream_quality])
-                            jpeg_data = buffer.tobytes()
-
-                            self.send_response(200)
-                            self.send_header('Content-type', 'image/jpeg')
-                            self.send_header('Content-length', str(len(jpeg_data)))
-                            self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-                            self.send_header('Pragma', 'no-cache')
-                            self.send_header('Expires', '0')
-                            self.end_headers()
+                    print("[DEBUG] /stream client connected")
+                    # Hold one connection open and push frames as multipart MJPEG
+                    self.send_response(200)
+                    self.send_header('Content-type', 'multipart/x-mixed-replace; boundary=FRAME')
+                    self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
+                    self.send_header('Pragma', 'no-cache')
+                    self.send_header('Expires', '0')
+                    self.end_headers()
+
+                    last_seq = -1
+                    try:
+                        while streamer.is_running:
+                            jpeg_data, seq = streamer.get_jpeg(last_seq)
+
+                            # Wait for the camera to produce a new frame
+                            if jpeg_data is None:
+                                time.sleep(1.0 / streamer.calibration_fps)
+                                continue
+
+                            last_seq = seq
+                            self.wfile.write(b"--FRAME\r\n")
+                            self.wfile.write(b"Content-Type: image/jpeg\r\n")
+                            self.wfile.write(b"Content-Length: %d\r\n\r\n" % len(jpeg_data))
                             self.wfile.write(jpeg_data)
-                        else:
-                            print("[DEBUG] No frame available, returning 404")
-                            self.send_response(404)
-                            self.end_headers()
+                            self.wfile.write(b"\r\n")
+                    except (BrokenPipeError, ConnectionResetError):
+                        print("[DEBUG] /stream client disconnected")
                 else:
                     self.send_response(404)
                     self.end_headers()
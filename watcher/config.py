@@ -18,6 +18,7 @@ MIN_MOTION_AREA = 1500  # Minimum area (in pixels) to consider as motion (higher
 MOTION_DETECTION_INTERVAL = 0.1  # Check for motion every 100ms
 MOTION_PERSISTENCE_FRAMES = 1  # Number of frames motion must persist to trigger recording
 MOTION_COOLDOWN_FRAMES = 2  # Number of frames to wait after motion stops before allowing new detection
+USE_OPENCL = False  # Run background subtraction on an OpenCL device if OpenCV finds one
 
 # Recording settings
 CLIP_DURATION = 10  # Duration of each recorded clip in seconds
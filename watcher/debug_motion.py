@@ -9,6 +9,13 @@ import sys
 from motion_detector import MotionDetector, PICAMERA2_AVAILABLE
 import config
 
+# Display names for MotionDetector.backend
+CAMERA_LABELS = {
+    'picamera2': "Picamera2",
+    'opencv': "OpenCV VideoCapture",
+    'none': "Unknown",
+}
+
 class MotionDebugger:
     """Debug motion detection with detailed output"""
 
@@ -36,14 +43,7 @@ class MotionDebugger:
         self.is_running = True
         self.motion_detector.start(self._on_motion_state_change)
 
-        # Determine camera type after initialization
-        if hasattr(self.motion_detector, 'picam') and self.motion_detector.picam:
-            camera_type = "Picamera2"
-        elif hasattr(self.motion_detector, 'cap') and self.motion_detector.cap:
-            camera_type = "OpenCV VideoCapture"
-        else:
-            camera_type = "Unknown"
-
+        camera_type = CAMERA_LABELS[self.motion_detector.backend]
         print(f"Camera initialized: {camera_type}")
 
         try:
@@ -63,29 +63,31 @@ class MotionDebugger:
     def _on_motion_state_change(self, motion_detected: bool):
         """Handle motion state changes with detailed logging"""
         current_time = time.time()
+        # Format the timestamp once for every line printed for this event
+        prefix = time.strftime('[%H:%M:%S]', time.localtime(current_time))
 
         if motion_detected:
             # Motion detected - increment persistence counter
             self.motion_persistence_count += 1
             self.motion_cooldown_count = 0
 
-            print(f"[{time.strftime('%H:%M:%S')}] MOTION DETECTED! (persistence: {self.motion_persistence_count}/{config.MOTION_PERSISTENCE_FRAMES})")
+            print(f"{prefix} MOTION DETECTED! (persistence: {self.motion_persistence_count}/{config.MOTION_PERSISTENCE_FRAMES})")
 
             # Check if motion persists for required frames
             if self.motion_persistence_count >= config.MOTION_PERSISTENCE_FRAMES:
                 self.motion_count += 1
                 self.last_motion_time = current_time
-                print(f"[{time.strftime('%H:%M:%S')}] *** MOTION PERSISTED! Starting recording... (#{self.motion_count}) ***")
+                print(f"{prefix} *** MOTION PERSISTED! Starting recording... (#{self.motion_count}) ***")
         else:
             # Motion stopped - increment cooldown counter
             self.motion_cooldown_count += 1
             old_persistence = self.motion_persistence_count
             self.motion_persistence_count = 0
 
-            print(f"[{time.strftime('%H:%M:%S')}] Motion stopped (cooldown: {self.motion_cooldown_count}/{config.MOTION_COOLDOWN_FRAMES})")
+            print(f"{prefix} Motion stopped (cooldown: {self.motion_cooldown_count}/{config.MOTION_COOLDOWN_FRAMES})")
 
             if old_persistence > 0:
-                print(f"[{time.strftime('%H:%M:%S')}] *** Motion persistence reset ***")
+                print(f"{prefix} *** Motion persistence reset ***")
 
 
 def signal_handler(sig, frame):
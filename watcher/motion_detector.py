@@ -26,9 +26,13 @@ class MotionDetector:
         self.camera_index = camera_index
         self.cap = None
         self.picam = None
+        self.backend = 'none'  # Camera backend in use: 'picamera2', 'opencv' or 'none'
         self.background_subtractor = cv2.createBackgroundSubtractorMOG2(
             history=100, varThreshold=config.MOTION_THRESHOLD, detectShadows=False
         )
+        # Offload background subtraction to OpenCL (T-API) when a device is available
+        self.use_opencl = config.USE_OPENCL and cv2.ocl.haveOpenCL()
+        cv2.ocl.setUseOpenCL(self.use_opencl)
         self.is_running = False
         self.motion_callback = None
         self.detection_thread = None
@@ -80,6 +84,7 @@ class MotionDetector:
         self.picam.start()
         time.sleep(2)  # Allow camera to warm up
         self.picam.set_controls({"AwbMode": 6})
+        self.backend = 'picamera2'
 
     def _init_opencv_camera(self):
         """Initialize OpenCV VideoCapture"""
@@ -92,6 +97,7 @@ class MotionDetector:
 
         if not self.cap.isOpened():
             raise RuntimeError(f"Could not open camera at index {self.camera_index}")
+        self.backend = 'opencv'
 
     def stop(self):
         """Stop motion detection"""
@@ -117,8 +123,8 @@ class MotionDetector:
             with self.frame_lock:
                 self.current_frame = frame.copy()
 
-            # Apply background subtraction
-            fg_mask = self.background_subtractor.apply(frame)
+            # Apply background subtraction (a UMat input dispatches to the OpenCL kernels)
+            fg_mask = self.background_subtractor.apply(cv2.UMat(frame) if self.use_opencl else frame)
 
             # Find contours of moving objects
             contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -143,9 +149,8 @@ class MotionDetector:
         """Get frame from camera (Picamera2 or OpenCV)"""
         if self.picam:
             try:
-                frame = self.picam.capture_array()
-                # Convert RGB to BGR for OpenCV compatibility
-                return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                # RGB888 is already B, G, R in memory, which is what OpenCV expects
+                return self.picam.capture_array()
             except Exception as e:
                 print(f"Failed to capture frame from Picamera2: {e}")
                 return None
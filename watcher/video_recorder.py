@@ -128,9 +128,9 @@ class VideoRecorder:
         writer = self._create_video_writer(temp_filepath)
 
         try:
+            # Frames come from the motion detector already in BGR order
             for frame in frames:
-                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                writer.write(frame_bgr)
+                writer.write(frame)
         finally:
             writer.release()
 